@@ -0,0 +1,131 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# benchmark.py
+
+# times maze generation and every solving strategy over a range of maze sizes, headless
+# (pygame is never imported), and writes the measurements to a JSON file so two runs can
+# be compared.
+
+# For every size and every generation algorithm, each seed produces one maze. The suite
+# records the generation time, then runs every engine in maze_solver.ALGORITHMS on that
+# maze and records its time, the expanded-node count and the path length. Even sizes give
+# mazes without an exit, so only their generation is timed. Timings come from
+# time.perf_counter() and peak memory from a separate tracemalloc pass, because
+# tracemalloc slows the code it traces down.
+
+# Usage:
+#   python benchmark.py                               # default sizes, writes bench_output.json
+#   python benchmark.py --sizes 21 201 2001 --seeds 0 1 2 --output before.json
+#   python benchmark.py --compare before.json after.json
+
+
+# Import the required libraries
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from maze_generator import GENERATORS, generate_maze
+from maze_solver import ALGORITHMS, solve
+
+DEFAULT_SIZES = [21, 41, 101, 201, 501, 1001, 2001, 4001]
+DEFAULT_SEEDS = [0, 1, 2]
+
+# The greedy walker explores most of the maze cell by cell; past this size it is skipped
+WALKER_MAX_SIZE = 1001
+
+# Run fn once and return (result, seconds)
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+# Run fn once under tracemalloc and return the peak traced memory in bytes
+def peak_memory(fn, *args, **kwargs):
+    tracemalloc.start()
+    try:
+        fn(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+# Benchmark one maze size for one generation algorithm and seed, return a list of records
+def bench_case(size, generator, seed, solvers, measure_memory=True):
+    cells = size * size
+    (grid, entrance, exit), seconds = timed(generate_maze, size, size, algorithm=generator, seed=seed)
+    records = [{
+        "kind": "generate", "algorithm": generator, "size": size, "seed": seed,
+        "seconds": seconds, "cells_per_second": cells / seconds if seconds else None,
+        "peak_bytes": peak_memory(generate_maze, size, size, algorithm=generator, seed=seed) if measure_memory else None,
+    }]
+    # An even size leaves the maze without an exit, so there is nothing to solve
+    if not exit:
+        return records
+    for solver in solvers:
+        if solver == "walker" and size > WALKER_MAX_SIZE:
+            continue
+        result, seconds = timed(solve, grid, entrance, exit, solver)
+        records.append({
+            "kind": "solve", "algorithm": solver, "generator": generator, "size": size, "seed": seed,
+            "seconds": seconds, "cells_per_second": cells / seconds if seconds else None,
+            "expanded": len(result.expanded), "path_length": len(result.path),
+            "peak_bytes": peak_memory(solve, grid, entrance, exit, solver) if measure_memory else None,
+        })
+    return records
+
+# Run the whole suite and return the report dictionary
+def run_suite(sizes, seeds, generators, solvers, measure_memory=True, log=sys.stderr):
+    records = []
+    for size in sizes:
+        for generator in generators:
+            for seed in seeds:
+                case = bench_case(size, generator, seed, solvers, measure_memory)
+                records.extend(case)
+                if log is not None:
+                    for record in case:
+                        print("%-8s %-13s size=%-5d seed=%-3d %.4fs" % (
+                            record["kind"], record["algorithm"], size, seed, record["seconds"]), file=log)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": sizes,
+        "seeds": seeds,
+        "records": records,
+    }
+
+# Key identifying the same measurement across two reports
+def record_key(record):
+    return (record["kind"], record["algorithm"], record.get("generator"), record["size"], record["seed"])
+
+# Print the time ratio of every measurement found in both reports (new / old)
+def compare(old_path, new_path):
+    with open(old_path) as file:
+        old = {record_key(r): r for r in json.load(file)["records"]}
+    with open(new_path) as file:
+        new = {record_key(r): r for r in json.load(file)["records"]}
+    for key in sorted(set(old) & set(new), key=str):
+        before, after = old[key]["seconds"], new[key]["seconds"]
+        ratio = after / before if before else float("inf")
+        print("%-8s %-13s gen=%-11s size=%-5d seed=%-3d %.4fs -> %.4fs  x%.2f" % (
+            key[0], key[1], key[2] or "-", key[3], key[4], before, after, ratio))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark maze generation and solving.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seeds", type=int, nargs="+", default=DEFAULT_SEEDS)
+    parser.add_argument("--generators", nargs="+", default=sorted(GENERATORS), choices=sorted(GENERATORS))
+    parser.add_argument("--solvers", nargs="+", default=sorted(ALGORITHMS), choices=sorted(ALGORITHMS))
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc passes")
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two saved reports and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        report = run_suite(args.sizes, args.seeds, args.generators, args.solvers, not args.no_memory)
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print("wrote %d records to %s" % (len(report["records"]), args.output))
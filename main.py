@@ -1,22 +1,26 @@
-# The code imports several modules, including shelve, pygame, os, sys, subprocess, and 
+# The code imports pygame, the scores module (SQLite) and the scene manager up front; tkinter is only imported
+# when a popup is actually shown.
 
 
-# The record_user_data() function stores user data in a database file named ".gamedata" using the shelve module
-# If the platform is Windows, it also sets the hidden attribute for the database files.
+# The player name and the run history are kept in the SQLite database of the scores module (".gamedata.db"),
+# one row per run, so recording a run does not rewrite the history.
 
-# The view_scores() function displays a pop-up window using the tkinter module that shows the score data recorded in the ".gamedata" file.
+# The view_scores() function displays a pop-up window using the tkinter module that pages through the recorded runs, newest first.
 
 # The StartGame class is initialized with a width and height parameter and is responsible for
 # running a Pygame game that counts down from ten minutes. Once the time is up, a message is displayed using the tkinter.messagebox.showinfo() function.
 
 # The MainMenu class is also initialized with a caption, size, and font size parameter.
-# It displays a menu screen using the Pygame module that includes two buttons: "Start Game" and
-# "View Scores." If the "Start Game" button is clicked, the os.startfile() function 
-# is used to launch the "puzzleinterphase.pyw" file. 
+# It is a scene (see scene_manager.py) that displays a menu screen that includes two buttons: "Start Game" and
+# "View Scores." If the "Start Game" button is clicked, the MazeGame scene of maze_game.py is opened 
+# on the same display, in the same process, and the time from the click to its first frame is measured
+# (printed when main.py is run with --debug).
+# Escape in the game returns to the menu.
 # If the "View Scores" button is clicked, the view_scores() function is called to display the score data.
 
-# The NamePrompt class is similar to the MainMenu class in that it displays a Pygame window.
-# However, it is used to prompt the user for their name before starting the game. The user's input is recorded in a text box and can be submitted using the "SUBMIT" button.
+# The NamePrompt class is similar to the MainMenu class in that it is a scene on the shared display.
+# However, it is used to prompt the user for their name before starting the game. The user's input is recorded in a text box and can be submitted using the "SUBMIT" button,
+# after which the main menu replaces it.
 
 
 # ___________________________OBJECT CLASS DIAGRAM________________________________________________________
@@ -38,47 +42,79 @@
         
 # The object classes in the diagram are as follows:
 
-# - MainMenu: This class is responsible for creating the main menu window, handling button click events, and displaying the buttons. It has attributes such as `screen`, `clock`, `font`, `start_button`, `scores_button`, and methods such as `handle_events()`, `draw()`, and `run()`.
+# - MainMenu: This scene is responsible for the main menu, handling button click events, and displaying the buttons. It has attributes such as `screen`, `font`, `start_button`, `scores_button`, and methods such as `enter()`, `handle_event()` and `update()`.
 
-# - NamePrompt: This class is responsible for creating the window to prompt for a username. It has attributes such as `screen`, `clock`, `font`, `input_box`, `color_active`, `color_inactive`, and methods such as `run()`.
+# - NamePrompt: This scene is responsible for prompting for a username. It has attributes such as `screen`, `font`, `input_box`, `color_active`, `color_inactive`, and methods such as `enter()`, `handle_event()` and `update()`.
 
 # - StartGame: This class is responsible for creating the game window, initializing variables, and running the game. It has attributes such as `width`, `height`, `screen`, `clock`, `font`, `remaining_time`, and methods such as `run()`.
 
 
 # Import the required libraries
-import shelve, pygame, os, sys, subprocess
-import tkinter.messagebox
-import tkinter as tk
-
-# State the database file names
-database_files = [".gamedata.bak", ".gamedata.dat", ".gamedata.dir"]
-
-# Take keys and values of data, write them in a shelve
-def record_user_data(**kwargs):
-    with shelve.open(".gamedata") as game_database:
-        for key, value in kwargs.items():
-            game_database[key] = value
-    if "win" in sys.platform:
-        for file in database_files:
-            subprocess.check_call(["attrib", "+H", file])  
+import sys
+import time
+import pygame
+
+import scores
+from scene_manager import SceneManager
+from maze_game import MazeGame
+
+# Number of runs shown per page of the score window
+SCORES_PAGE_SIZE = 20
+
+# Show an error popup; tkinter is only imported once a popup is actually needed
+def show_error(message):
+    import tkinter.messagebox
+    tkinter.messagebox.showerror("Pygame", message)
 
 # View scores
 def view_scores():
+    import tkinter as tk
     popup = tk.Tk()
     popup.title("Pygame-VIEW SCORES")
     popup.geometry("500x400")
     popup.wm_attributes("-topmost", True)
-    tk.Button(popup, text="OK", font=(None, 25, "bold"), command=popup.destroy, width=5, background="#20BEBE").pack(side="bottom", pady=10)
+    buttons = tk.Frame(popup)
+    buttons.pack(side="bottom", pady=10)
     
     game_score = tk.Text(popup, font=(None, 10, "bold"))
     game_score.pack(expand="yes")
 
-    # Open database
-    with shelve.open(".gamedata") as gamedata:
-        if not gamedata["showreport"]:
-            game_score.insert("0.0", "NO SCORE HAS BEEN RECORDED YET")
+    # Open database, page through the runs newest first
+    connection = scores.connect()
+    pages = [None]  # the "before" id of every page shown so far
+    last_shown = [None]  # the id of the oldest run on the current page
+
+    def show_page():
+        runs = scores.page_runs(connection, pages[-1], SCORES_PAGE_SIZE)
+        game_score.delete("1.0", "end")
+        if not runs and len(pages) == 1:
+            game_score.insert("1.0", "NO SCORE HAS BEEN RECORDED YET")
         else:
-            game_score.insert("0.0", gamedata["report"])
+            game_score.insert("1.0", "".join(scores.format_run(run) for run in runs))
+        newer_button.config(state="normal" if len(pages) > 1 else "disabled")
+        older = bool(runs) and scores.has_older(connection, runs[-1]["id"])
+        older_button.config(state="normal" if older else "disabled")
+        last_shown[0] = runs[-1]["id"] if runs else None
+
+    def newer():
+        pages.pop()
+        show_page()
+
+    def older():
+        pages.append(last_shown[0])
+        show_page()
+
+    def close():
+        connection.close()
+        popup.destroy()
+
+    newer_button = tk.Button(buttons, text="<", font=(None, 25, "bold"), command=newer, width=2, background="#20BEBE")
+    newer_button.pack(side="left", padx=5)
+    tk.Button(buttons, text="OK", font=(None, 25, "bold"), command=close, width=5, background="#20BEBE").pack(side="left", padx=5)
+    older_button = tk.Button(buttons, text=">", font=(None, 25, "bold"), command=older, width=2, background="#20BEBE")
+    older_button.pack(side="left", padx=5)
+    popup.protocol("WM_DELETE_WINDOW", close)
+    show_page()
 
     popup.mainloop()
 
@@ -114,68 +150,61 @@ class StartGame:
             if self.remaining_time == 0:
                 running = False
         
+        import tkinter.messagebox
         tkinter.messagebox.showinfo("Pygame", "Time is up!\n[Results will show here...]")
 
-# Create a main menu window
+# Create a main menu scene
 class MainMenu:
     def __init__(self, caption, size=(400, 300), font_size=32):
         # Initialize the variables
-        pygame.init()
-        self.screen = pygame.display.set_mode(size)
-        pygame.display.set_caption(caption)
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, font_size)
+        self.caption = caption
+        self.size = size
+        self.font_size = font_size
+        self.manager = None
         self.start_button = pygame.Rect(100, 100, 200, 50)
-        self.start_button_text = self.font.render('Start Game', True, pygame.Color('white'))
         self.start_button_color = pygame.Color('deepskyblue')
         self.scores_button = pygame.Rect(100, 200, 200, 50)
-        self.scores_button_text = self.font.render('View Scores', True, pygame.Color('white'))
         self.scores_button_color = pygame.Color('deepskyblue')
 
+    def enter(self, manager):
+        self.manager = manager
+        self.screen = manager.screen
+        self.font = pygame.font.Font(None, self.font_size)
+        self.start_button_text = self.font.render('Start Game', True, pygame.Color('white'))
+        self.scores_button_text = self.font.render('View Scores', True, pygame.Color('white'))
+
+    def leave(self):
+        pass
+
     # Handle button click events   
-    def handle_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return False
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if self.start_button.collidepoint(event.pos):
-                    # print('Starting game...')
-                    os.startfile("puzzleinterphase.pyw")
-                elif self.scores_button.collidepoint(event.pos):
-                    # print('Viewing scores...')
-                    view_scores()
-        return True
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.start_button.collidepoint(event.pos):
+                # Open the maze game on the same display, timing the launch
+                self.manager.launch_started = time.perf_counter()
+                self.manager.push(MazeGame())
+            elif self.scores_button.collidepoint(event.pos):
+                view_scores()
 
     # Draw Start Game button
-    def draw(self):
+    def update(self):
         self.screen.fill(pygame.Color('white'))
         
         pygame.draw.rect(self.screen, self.start_button_color, self.start_button)
-        self.start_button_text = self.font.render('Start Game', True, pygame.Color('white'))
         self.screen.blit(self.start_button_text, (140, 110))
         
         pygame.draw.rect(self.screen, self.scores_button_color, self.scores_button)
-        self.scores_button_text = self.font.render('View Scores', True, pygame.Color('white'))
         self.screen.blit(self.scores_button_text, (135, 210))
         
         pygame.display.flip()
-        self.clock.tick(60)
 
-    def run(self):
-        running = True
-        while running:
-            running = self.handle_events()
-            self.draw()
-        pygame.quit()
-
-# Create a window to prompt username
+# Create a scene to prompt username
 class NamePrompt:
     def __init__(self, caption, size=(400, 300), font_size=32):
-        pygame.init()
-        self.screen = pygame.display.set_mode(size)
-        pygame.display.set_caption(caption)
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, font_size)
+        self.caption = caption
+        self.size = size
+        self.font_size = font_size
+        self.manager = None
         self.input_box = pygame.Rect(100, 100, 200, 50)
         self.color_inactive = pygame.Color('lightskyblue3')
         self.color_active = pygame.Color('dodgerblue2')
@@ -183,52 +212,52 @@ class NamePrompt:
         self.active = False
         self.text = ''
         self.button = pygame.Rect(150, 200, 100, 50)
-        self.button_text = self.font.render('SUBMIT', True, pygame.Color('white'))
         self.button_color = pygame.Color('deepskyblue')
         self.blink = True     
 
+    def enter(self, manager):
+        self.manager = manager
+        self.screen = manager.screen
+        self.font = pygame.font.Font(None, self.font_size)
+        self.button_text = self.font.render('SUBMIT', True, pygame.Color('white'))
+
+    def leave(self):
+        pass
+
+    # Record the entered name and hand over to the main menu
+    def submit(self):
+        print("Username entered: ", self.text)
+        if self.text != "":
+            scores.set_username(self.text)
+            self.manager.replace(MainMenu('Main Menu, PLAYER:'))
+        else:
+            show_error("Name cannot be left blank!")
+        self.text = ''
+
     # Handle button clicks and keyboard bindings
-    def handle_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return False
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if self.input_box.collidepoint(event.pos):
-                    self.active = True
-                    self.color = self.color_active
-                elif self.button.collidepoint(event.pos):
-                    print("Username entered: ", self.text)
-                    if self.text != "":
-                        record_user_data(username=self.text, showreport=False, report="")
-                        self.menu = MainMenu('Main Menu, PLAYER:')
-                        self.menu.run()
-                    else:
-                        tkinter.messagebox.showerror("Pygame", "Name cannot be left blank!")
-                    self.text = ''
-                else:
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.input_box.collidepoint(event.pos):
+                self.active = True
+                self.color = self.color_active
+            elif self.button.collidepoint(event.pos):
+                self.submit()
+            else:
+                self.active = False
+                self.color = self.color_inactive
+        if event.type == pygame.KEYDOWN:
+            if self.active:
+                if event.key == pygame.K_RETURN:
                     self.active = False
                     self.color = self.color_inactive
-            if event.type == pygame.KEYDOWN:
-                if self.active:
-                    if event.key == pygame.K_RETURN:
-                        print("Username entered: ", self.text)
-                        if self.text != "":
-                            record_user_data(username=self.text, showreport=False, report="")
-                            self.menu = MainMenu('Main Menu, PLAYER:')
-                            self.menu.run()
-                        else:
-                            tkinter.messagebox.showerror("Pygame", "Name cannot be left blank!")
-                        self.text = ''
-                        self.active = False
-                        self.color = self.color_inactive
-                    elif event.key == pygame.K_BACKSPACE:
-                        self.text = self.text[:-1]
-                    else:
-                        self.text += event.unicode
-        return True
+                    self.submit()
+                elif event.key == pygame.K_BACKSPACE:
+                    self.text = self.text[:-1]
+                else:
+                    self.text += event.unicode
 
     # Create a blinking cursor event
-    def draw(self):
+    def update(self):
         self.screen.fill(pygame.Color('white'))
         pygame.draw.rect(self.screen, self.color, self.input_box, 2)
         txt_surface = self.font.render(self.text, True, pygame.Color('black'))
@@ -246,26 +275,11 @@ class NamePrompt:
             self.blink = False
         
         pygame.display.flip()
-        self.clock.tick(60)
-
-    def run(self):
-        running = True
-        while running:
-            running = self.handle_events()
-            self.draw()
-        pygame.quit()
 
-# Run the game instance
+# Run the game instance: every window is a scene on one shared display
 if __name__ == '__main__':
-    existing_confirmed = []    
-    for file in database_files:
-        if os.path.exists(file):
-            existing_confirmed.append(file)
-    if existing_confirmed != database_files:
-        # Remove the available files cause they have been either altered or corrupted.
-        [os.remove(file) for file in existing_confirmed]
-        prompt = NamePrompt('Name Prompt')
-        prompt.run() 
+    manager = SceneManager(60, debug='--debug' in sys.argv[1:])
+    if scores.get_username() is None:
+        manager.run(NamePrompt('Name Prompt'))
     else:
-        menu = MainMenu('Main Menu, PLAYER:')
-        menu.run() 
+        manager.run(MainMenu('Main Menu, PLAYER:'))
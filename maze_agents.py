@@ -0,0 +1,205 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# maze_agents.py
+
+# steps many search agents in lockstep over one shared maze, to compare strategies
+# without copying the maze for each agent.
+
+# The AgentWorld takes a read-only snapshot of the wall layout. Agents never write to it:
+# each agent keeps what it has walked and what it has found to be a dead end in two
+# bitsets of its own (one bit per cell), which stand in for the WALKED and DEAD marks
+# solve_maze writes into the maze.
+
+# Strategies:
+#   walker                   - the greedy walker of solve_maze, one step per tick, reading
+#                              its marks from its own bitsets
+#   bfs, astar, bidirectional - plan a shortest path once with the maze_solver engine of
+#                              that name, then follow it one step per tick. Plans are
+#                              shared between agents with the same start and goal.
+
+# tick() advances every active agent by one step in a single pass, with the state kept in
+# flat per-agent lists so the loop stays tight. run() ticks until every
+# agent has finished, and summary() compares the strategies.
+
+
+# Import the required libraries
+from collections import namedtuple
+
+from maze_grid import WALLS_ONLY, neighbor_indices
+from maze_solver import ALGORITHMS, CellType, flatten
+
+# Final report of one agent
+AgentResult = namedtuple("AgentResult", ["agent", "strategy", "reached", "steps", "expanded"])
+
+# Define a class for the multi-agent world
+class AgentWorld:
+
+    def __init__(self, maze):
+        cells, width, height = flatten(maze)
+        # Immutable snapshot shared by every agent
+        self.cells = bytes(cells).translate(WALLS_ONLY)
+        self.width = width
+        self.height = height
+        self.tick_count = 0
+        # Per-agent state, indexed by agent id
+        self.strategy = []
+        self.position = []
+        self.goal = []
+        self.steps = []
+        self.active = []
+        self.reached = []
+        self.expanded = []  # cells expanded while planning (planners only)
+        self.walked = []   # bitset overlay per agent (walker only)
+        self.dead = []     # bitset overlay per agent (walker only)
+        self.plan = []     # (path, index into path) per agent (planners only)
+        # Shared plans: (strategy, start, goal) -> (path, expanded count)
+        self.plans = {}
+
+    # Return the flat index of an open (x, y) cell
+    def _index(self, pos):
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.height) or self.cells[y * self.width + x] == CellType.WALL:
+            raise ValueError("position (%s, %s) is not an open cell of the maze" % (x, y))
+        return y * self.width + x
+
+    # Add one agent and return its id
+    def add_agent(self, start, goal, strategy="walker"):
+        if strategy != "walker" and strategy not in ALGORITHMS:
+            raise ValueError("unknown strategy %r" % strategy)
+        start, goal = self._index(start), self._index(goal)
+        agent = len(self.strategy)
+        self.strategy.append(strategy)
+        self.position.append(start)
+        self.goal.append(goal)
+        self.steps.append(0)
+        self.active.append(True)
+        self.reached.append(False)
+        if strategy == "walker":
+            size = (len(self.cells) + 7) // 8
+            self.walked.append(bytearray(size))
+            self.dead.append(bytearray(size))
+            self.plan.append(None)
+            self.expanded.append(0)
+        else:
+            key = (strategy, start, goal)
+            if key not in self.plans:
+                path, expanded = ALGORITHMS[strategy](self.cells, self.width, start, goal)
+                self.plans[key] = (path, len(expanded))
+            path, expanded = self.plans[key]
+            self.walked.append(None)
+            self.dead.append(None)
+            self.plan.append([path, 0])
+            self.expanded.append(expanded)
+            if not path:
+                self.active[agent] = False
+        return agent
+
+    # Add count agents with the same start, goal and strategy and return their ids
+    def add_agents(self, count, start, goal, strategy="walker"):
+        return [self.add_agent(start, goal, strategy) for _ in range(count)]
+
+    # Return the (x, y) position of an agent
+    def position_of(self, agent):
+        idx = self.position[agent]
+        return idx % self.width, idx // self.width
+
+    # Return the state an agent sees for cell (x, y): the shared wall layout with its own marks on top
+    def cell_state(self, agent, x, y):
+        idx = y * self.width + x
+        if self.cells[idx] == CellType.WALL:
+            return CellType.WALL
+        dead, walked = self.dead[agent], self.walked[agent]
+        if dead is not None and dead[idx >> 3] & (1 << (idx & 7)):
+            return CellType.DEAD
+        if walked is not None and walked[idx >> 3] & (1 << (idx & 7)):
+            return CellType.WALKED
+        return CellType.ROAD
+
+    # Advance every active agent by one step and return how many are still active
+    def tick(self):
+        cells, width = self.cells, self.width
+        count = len(cells)
+        position, goal, steps, active, reached = self.position, self.goal, self.steps, self.active, self.reached
+        remaining = 0
+        for agent in range(len(position)):
+            if not active[agent]:
+                continue
+            idx = position[agent]
+            plan = self.plan[agent]
+            if plan is not None:
+                # Planner: follow the shared path
+                path, i = plan
+                if i + 1 < len(path):
+                    plan[1] = i + 1
+                    position[agent] = path[i + 1]
+                    steps[agent] += 1
+                if plan[1] + 1 >= len(path):
+                    active[agent] = False
+                    reached[agent] = True
+                else:
+                    remaining += 1
+                continue
+
+            # Greedy walker, mirroring solve_maze with the marks kept in the agent's bitsets
+            walked, dead = self.walked[agent], self.dead[agent]
+            if idx == goal[agent]:
+                walked[idx >> 3] |= 1 << (idx & 7)
+                active[agent] = False
+                reached[agent] = True
+                continue
+            best, best_value = -1, CellType.DEAD
+            # Top, right, down, left, keeping the first neighbor with the lowest value
+            for n in neighbor_indices(idx, width, count):
+                if cells[n] == CellType.WALL:
+                    continue
+                byte, bit = n >> 3, 1 << (n & 7)
+                if dead[byte] & bit:
+                    continue
+                value = CellType.WALKED if walked[byte] & bit else CellType.ROAD
+                if value < best_value:
+                    best, best_value = n, value
+                    if value == CellType.ROAD:
+                        break
+            byte, bit = idx >> 3, 1 << (idx & 7)
+            if best == -1:
+                dead[byte] |= bit
+                active[agent] = False
+                continue
+            if best_value == CellType.WALKED:
+                dead[byte] |= bit
+            else:
+                walked[byte] |= bit
+            position[agent] = best
+            steps[agent] += 1
+            remaining += 1
+        self.tick_count += 1
+        return remaining
+
+    # Tick until every agent has finished or max_ticks is reached; return the tick count
+    def run(self, max_ticks=None):
+        while any(self.active):
+            if max_ticks is not None and self.tick_count >= max_ticks:
+                break
+            self.tick()
+        return self.tick_count
+
+    # Return the AgentResult of every agent; a walker expands one cell per step
+    def results(self):
+        return [AgentResult(agent, self.strategy[agent], self.reached[agent], self.steps[agent],
+                            self.steps[agent] if self.plan[agent] is None else self.expanded[agent])
+                for agent in range(len(self.strategy))]
+
+    # Return, per strategy, the agent count, success rate and mean steps of the agents that reached their goal
+    def summary(self):
+        table = {}
+        for result in self.results():
+            row = table.setdefault(result.strategy, {"agents": 0, "reached": 0, "steps": 0})
+            row["agents"] += 1
+            if result.reached:
+                row["reached"] += 1
+                row["steps"] += result.steps
+        for row in table.values():
+            row["mean_steps"] = row["steps"] / row["reached"] if row["reached"] else None
+            row["success_rate"] = row["reached"] / row["agents"]
+            del row["steps"]
+        return table
@@ -0,0 +1,224 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# maze_analytics.py
+
+# grades generated mazes by difficulty in bulk and keeps them in a sorted index, so a
+# level of a given difficulty can be picked in O(log n) instead of at random.
+
+# grade_maze() measures one maze:
+#   path_length    - cells on the shortest path from the entrance to the exit
+#   dead_ends      - open cells with a single open neighbor
+#   junctions      - open cells with three or four open neighbors
+#   branching      - mean number of ways on at a junction (open neighbors minus the way in)
+#   path_junctions - junctions on the shortest path, the choices a player has to get right
+#   walker_steps   - steps the greedy walker of solve_maze takes to reach the exit
+#   wasted         - walker steps beyond the shortest path
+# and combines them into one difficulty score with the weights in DIFFICULTY_WEIGHTS.
+
+# Neighbor counts are computed for the whole grid at once, never cell by cell. With NumPy,
+# the grid array is shifted four ways and summed. Without it, the open cells become one
+# big int with a bit per cell: the four shifted copies are added with bitwise full adders,
+# leaving the count in three bit planes, and each metric is a popcount of a combination
+# of those planes.
+
+# grade_levels() streams LevelGrade records over any number of seeds, optionally on a
+# process pool. A LevelIndex keeps the grades sorted by difficulty: nearest() and
+# between() use bisect, and save()/load() store the index as JSON lines.
+
+# Usage:
+#   python maze_analytics.py --count 2000 --size 41 --output levels.jsonl
+
+
+# Import the required libraries
+import argparse
+import bisect
+import json
+import multiprocessing
+from collections import namedtuple
+
+from maze_generator import generate_maze
+from maze_solver import ALGORITHMS, CellType, OPEN_DIGIT, flatten, solve
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Metrics of one maze, identified by the (width, height, algorithm, seed) it is generated from
+LevelGrade = namedtuple("LevelGrade", [
+    "width", "height", "algorithm", "seed", "path_length", "dead_ends", "junctions",
+    "branching", "path_junctions", "walker_steps", "wasted", "difficulty",
+])
+
+# How much each metric adds to the difficulty score
+DIFFICULTY_WEIGHTS = {
+    "path_length": 1.0,
+    "path_junctions": 4.0,
+    "wasted": 0.5,
+}
+
+# Column masks (bit x of every row set) per maze size, for the big-int neighbor counts
+_COLUMN_MASKS = {}
+
+def _popcount(bits):
+    return bin(bits).count("1")
+
+# Return (first column, last column) masks of a width x height bit board
+def _column_masks(width, height):
+    masks = _COLUMN_MASKS.get((width, height))
+    if masks is None:
+        first = int(("0" * (width - 1) + "1") * height, 2)
+        masks = _COLUMN_MASKS[(width, height)] = (first, first << (width - 1))
+    return masks
+
+# Return (open cells, cells with 1 open neighbor, with 3, with 4) as big ints, bit y * width + x per cell
+def _degree_planes(cells, width, height):
+    open_cells = int(bytes(cells).translate(OPEN_DIGIT)[::-1], 2)
+    first, last = _column_masks(width, height)
+    # Bit i of each plane is set when the neighbor of cell i on that side is open
+    above = open_cells << width
+    below = open_cells >> width
+    left = (open_cells & ~last) << 1
+    right = (open_cells & ~first) >> 1
+    # Add the four neighbor planes with full adders into a 3-bit count per cell
+    s1, c1 = above ^ below, above & below
+    s2, c2 = left ^ right, left & right
+    bit0 = s1 ^ s2
+    carry = s1 & s2
+    bit1 = c1 ^ c2 ^ carry
+    bit2 = c1 & c2
+    one = open_cells & bit0 & ~bit1 & ~bit2
+    three = open_cells & bit0 & bit1
+    four = open_cells & bit2
+    return open_cells, one, three, four
+
+# Count dead ends and junctions, the sum of the junctions' degrees, and the junctions among path cells
+def degree_counts(maze, path=()):
+    cells, width, height = flatten(maze)
+    if numpy is not None:
+        grid = numpy.frombuffer(bytes(cells), dtype=numpy.uint8).reshape(height, width) != CellType.WALL
+        padded = numpy.pad(grid, 1)
+        degree = (padded[:-2, 1:-1].astype(numpy.uint8) + padded[2:, 1:-1] + padded[1:-1, :-2] + padded[1:-1, 2:]) * grid
+        junction = degree >= 3
+        on_path = sum(1 for x, y in path if junction[y, x])
+        return (int(numpy.count_nonzero(degree == 1)), int(numpy.count_nonzero(junction)),
+                int(degree[junction].sum()), on_path)
+    _, one, three, four = _degree_planes(cells, width, height)
+    junctions = three | four
+    on_path = sum(1 for x, y in path if junctions >> (y * width + x) & 1)
+    threes, fours = _popcount(three), _popcount(four)
+    return _popcount(one), threes + fours, 3 * threes + 4 * fours, on_path
+
+# Combine the metrics into one difficulty score
+def difficulty(metrics):
+    return sum(weight * metrics[name] for name, weight in DIFFICULTY_WEIGHTS.items())
+
+# Measure a maze that was generated from (width, height, algorithm, seed)
+def grade_maze(maze, entrance, exit, width, height, algorithm, seed):
+    if not exit:
+        path = []
+        walker_steps = 0
+    else:
+        path = solve(maze, entrance, exit, "bfs").path
+        cells, _, _ = flatten(maze)
+        start, goal = entrance[1] * width + entrance[0], exit[1] * width + exit[0]
+        walker_steps = len(ALGORITHMS["walker"](cells, width, start, goal)[1]) - 1
+    dead_ends, junctions, junction_degrees, path_junctions = degree_counts(maze, path)
+    metrics = {
+        "path_length": len(path),
+        "dead_ends": dead_ends,
+        "junctions": junctions,
+        "branching": (junction_degrees - junctions) / junctions if junctions else 0.0,
+        "path_junctions": path_junctions,
+        "walker_steps": walker_steps,
+        "wasted": max(0, walker_steps - max(0, len(path) - 1)),
+    }
+    return LevelGrade(width, height, algorithm, seed, difficulty=difficulty(metrics), **metrics)
+
+# Worker: generate one maze and grade it
+def _grade(job):
+    width, height, algorithm, seed = job
+    maze, entrance, exit = generate_maze(width, height, algorithm=algorithm, seed=seed)
+    return grade_maze(maze, entrance, exit, width, height, algorithm, seed)
+
+# Grade the maze of every seed, yielding LevelGrades; sizes is one size or a list of
+# sizes used in turn. Sizes must be odd: an even maze has no exit and cannot be played.
+# With workers > 1 the grades come from a process pool, in completion order.
+def grade_levels(seeds, size=41, algorithm="prim", workers=1, chunksize=16):
+    sizes = size if isinstance(size, (list, tuple)) else [size]
+    for side in sizes:
+        if side < 3 or side % 2 == 0:
+            raise ValueError("maze size %d has no exit; sizes must be odd and at least 3" % side)
+    jobs = ((sizes[i % len(sizes)], sizes[i % len(sizes)], algorithm, seed) for i, seed in enumerate(seeds))
+    if workers <= 1:
+        for job in jobs:
+            yield _grade(job)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        for grade in pool.imap_unordered(_grade, jobs, chunksize):
+            yield grade
+
+# Define a class for the index of graded levels, sorted by difficulty
+class LevelIndex:
+
+    def __init__(self, grades=()):
+        self.grades = sorted(grades, key=lambda grade: (grade.difficulty, grade.seed))
+        self.keys = [grade.difficulty for grade in self.grades]
+
+    def __len__(self):
+        return len(self.grades)
+
+    # Insert one grade in (difficulty, seed) order, as the constructor sorts
+    def add(self, grade):
+        lo = bisect.bisect_left(self.keys, grade.difficulty)
+        hi = bisect.bisect_right(self.keys, grade.difficulty, lo)
+        i = lo + bisect.bisect_right([other.seed for other in self.grades[lo:hi]], grade.seed)
+        self.keys.insert(i, grade.difficulty)
+        self.grades.insert(i, grade)
+
+    # Return the grade whose difficulty is closest to target, or None when empty
+    def nearest(self, target):
+        if not self.grades:
+            return None
+        i = bisect.bisect_left(self.keys, target)
+        if i == len(self.keys) or (i > 0 and target - self.keys[i - 1] <= self.keys[i] - target):
+            i -= 1
+        return self.grades[i]
+
+    # Return the grades with low <= difficulty < high
+    def between(self, low, high):
+        return self.grades[bisect.bisect_left(self.keys, low):bisect.bisect_left(self.keys, high)]
+
+    # Return the grade at the given fraction of the difficulty range, 0 the easiest and 1 the hardest
+    def at_rank(self, fraction):
+        if not self.grades:
+            return None
+        return self.grades[min(len(self.grades) - 1, int(fraction * len(self.grades)))]
+
+    # Write the index as one JSON object per line
+    def save(self, path):
+        with open(path, "w") as file:
+            for grade in self.grades:
+                file.write(json.dumps(grade._asdict()) + "\n")
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as file:
+            return cls(LevelGrade(**json.loads(line)) for line in file if line.strip())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grade generated mazes by difficulty and build a level index.")
+    parser.add_argument("--count", type=int, default=1000, help="number of seeds to grade")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--size", type=int, nargs="+", default=[41], help="odd maze sides, used in turn")
+    parser.add_argument("--algorithm", default="prim")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--output", default="levels.jsonl")
+    args = parser.parse_args()
+    if any(side < 3 or side % 2 == 0 for side in args.size):
+        parser.error("--size values must be odd and at least 3, even mazes have no exit")
+    seeds = range(args.first_seed, args.first_seed + args.count)
+    index = LevelIndex(grade_levels(seeds, args.size, args.algorithm, args.workers))
+    index.save(args.output)
+    print("graded %d levels, difficulty %.1f to %.1f, written to %s"
+          % (len(index), index.keys[0], index.keys[-1], args.output))
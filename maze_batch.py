@@ -0,0 +1,87 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# maze_batch.py
+
+# generates and solves many mazes at once on a process pool, for building level catalogs.
+
+# generate_and_solve_batch(n, size, workers=...) hands out n jobs to the worker processes
+# and yields a BatchResult for each maze as soon as it is done, in completion order. Every
+# job carries its own seed, drawn in job order from the batch seed by the parent process as
+# the jobs are handed out, so a batch is reproducible whichever worker runs which job.
+
+# Results travel back in a compact encoding instead of pickled nested lists: the walls are
+# bit-packed with Grid.pack_walls() and the solution path is a string of Direction codes,
+# two bits per move. decode_result() turns a BatchResult back into a Grid and a path.
+
+
+# Import the required libraries
+import multiprocessing
+import random
+from collections import namedtuple
+
+from maze_generator import DIRECTION_STEPS, generate_maze
+from maze_grid import Grid
+from maze_solver import solve
+
+# One generated and solved maze. walls is Grid.pack_walls() output, moves holds the
+# path_length - 1 moves from the entrance as packed Direction codes.
+BatchResult = namedtuple("BatchResult", [
+    "index", "seed", "width", "height", "entrance", "exit", "walls", "path_length", "moves",
+])
+
+# Direction of each cell coordinate change, the inverse of maze_generator's DIRECTION_STEPS
+_DIRECTION = {step: direction for direction, step in DIRECTION_STEPS.items()}
+
+# Pack a path of (x, y) cells into Direction codes, four moves per byte
+def encode_path(path):
+    out = bytearray((len(path) + 2) // 4)
+    for i in range(len(path) - 1):
+        (x0, y0), (x1, y1) = path[i], path[i + 1]
+        out[i >> 2] |= _DIRECTION[(x1 - x0, y1 - y0)] << (2 * (i & 3))
+    return bytes(out)
+
+# Unpack the given number of moves from start back into a path of (x, y) cells
+def decode_path(start, moves, length):
+    x, y = start
+    path = [(x, y)]
+    for i in range(length - 1):
+        dx, dy = DIRECTION_STEPS[(moves[i >> 2] >> (2 * (i & 3))) & 3]
+        x, y = x + dx, y + dy
+        path.append((x, y))
+    return path
+
+# Rebuild the maze Grid and the solution path of a BatchResult
+def decode_result(result):
+    grid = Grid.from_walls(result.width, result.height, result.walls)
+    if not result.path_length:
+        return grid, []
+    return grid, decode_path(result.entrance, result.moves, result.path_length)
+
+# Worker: generate one maze from its job seed, solve it and encode the result
+def _generate_and_solve(job):
+    index, seed, width, height, algorithm, solver = job
+    grid, entrance, exit = generate_maze(width, height, algorithm=algorithm, seed=seed)
+    path = solve(grid, entrance, exit, solver).path if exit else []
+    return BatchResult(
+        index, seed, width, height, tuple(entrance), tuple(exit),
+        grid.pack_walls(), len(path), encode_path(path),
+    )
+
+# Generate and solve n mazes of the given size (an int for square mazes, or a
+# (width, height) pair) on a pool of worker processes, yielding BatchResults as they
+# complete. workers defaults to the number of CPUs.
+def generate_and_solve_batch(n, size, workers=None, seed=None, algorithm="prim", solver="bfs", chunksize=None):
+    width, height = (size, size) if isinstance(size, int) else size
+    workers = workers or multiprocessing.cpu_count()
+    # Job seeds are drawn in the parent in job order, so results do not depend on scheduling
+    seeds = random.Random(seed)
+    jobs = ((index, seeds.getrandbits(64), width, height, algorithm, solver) for index in range(n))
+    if chunksize is None:
+        chunksize = max(1, min(64, n // (workers * 8)))
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(_generate_and_solve, jobs, chunksize):
+            yield result
+
+if __name__ == "__main__":
+    for result in generate_and_solve_batch(8, 41, seed=0):
+        print(result.index, result.seed, result.path_length, len(result.walls), "bytes")
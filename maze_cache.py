@@ -0,0 +1,141 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# maze_cache.py
+
+# answers many path queries against the same maze without searching again.
+
+# A DistanceField is one breadth-first search run backwards from a goal cell. It stores,
+# for every open cell, the number of steps to the goal and the neighbor one step closer
+# to it. Any later query from any cell walks those predecessors, so it costs only as much
+# as the path it returns. The field never writes to the maze. Only WALL cells block, so a
+# maze the walker has already marked up can still be queried.
+
+# FieldCache keeps the most recently used fields in an LRU. The cache key is a content
+# hash of the wall layout (solver states are ignored) plus the goal, so equal mazes share
+# a field. A Grid keeps its hash in grid.cache, so a cached query costs only as much as
+# its answer; after changing walls call grid.invalidate() so the maze is hashed again.
+# The module-level helpers path_from(), distance_to() and hint() go through a shared
+# default cache.
+
+
+# Import the required libraries
+import hashlib
+from array import array
+from collections import OrderedDict
+
+from maze_grid import WALLS_ONLY, neighbor_indices
+from maze_solver import CellType, flatten
+
+# Return a hash of the wall layout of the maze, ignoring solver states. A Grid keeps it
+# in grid.cache, so it is computed once per wall layout: Grid.fill(), generate_maze() into
+# the grid and DynamicMaze edits all call invalidate(), which drops it.
+def content_hash(maze):
+    cache = getattr(maze, "cache", None)
+    if cache is not None and "content_hash" in cache:
+        return cache["content_hash"]
+    cells, width, height = flatten(maze)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(b"%d:%d:" % (width, height))
+    digest.update(bytes(cells).translate(WALLS_ONLY))
+    value = digest.hexdigest()
+    if cache is not None:
+        cache["content_hash"] = value
+    return value
+
+# Define a class for the distance/predecessor field towards one goal
+class DistanceField:
+
+    # Run a breadth-first search from the goal over the open cells of the maze
+    def __init__(self, maze, goal):
+        cells, width, height = flatten(maze)
+        self.width = width
+        self.height = height
+        self.goal = tuple(goal)
+        count = width * height
+        # Steps to the goal (-1 when unreachable) and the next cell towards it (-1 at the goal)
+        dist = array("i", [-1]) * count
+        step = array("i", [-1]) * count
+        start = goal[1] * width + goal[0]
+        if not (0 <= goal[0] < width and 0 <= goal[1] < height) or cells[start] == CellType.WALL:
+            raise ValueError("goal (%s, %s) is not an open cell of the maze" % tuple(goal))
+        dist[start] = 0
+        layer = [start]
+        d = 0
+        while layer:
+            d += 1
+            next_layer = []
+            for idx in layer:
+                for n in neighbor_indices(idx, width, count):
+                    if dist[n] == -1 and cells[n] != CellType.WALL:
+                        dist[n] = d
+                        step[n] = idx
+                        next_layer.append(n)
+            layer = next_layer
+        self.dist = dist
+        self.step = step
+
+    # Return the number of steps from (x, y) to the goal, or -1 if it cannot be reached
+    def distance(self, x, y):
+        return self.dist[y * self.width + x]
+
+    # Return the cell one step closer to the goal from (x, y), or None at the goal or when unreachable
+    def next_step(self, x, y):
+        idx = self.step[y * self.width + x]
+        if idx == -1:
+            return None
+        return idx % self.width, idx // self.width
+
+    # Return the shortest path from (x, y) to the goal as a list of (x, y) cells, empty if unreachable
+    def path_from(self, x, y):
+        width, step = self.width, self.step
+        idx = y * width + x
+        if self.dist[idx] == -1:
+            return []
+        path = [(x, y)]
+        idx = step[idx]
+        while idx != -1:
+            path.append((idx % width, idx // width))
+            idx = step[idx]
+        return path
+
+# Define a class for the LRU cache of distance fields
+class FieldCache:
+
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self.fields = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    # Return the distance field of the maze towards goal, computing it on a miss
+    def get(self, maze, goal):
+        key = (content_hash(maze), tuple(goal))
+        field = self.fields.get(key)
+        if field is not None:
+            self.hits += 1
+            self.fields.move_to_end(key)
+            return field
+        self.misses += 1
+        field = DistanceField(maze, goal)
+        self.fields[key] = field
+        if len(self.fields) > self.maxsize:
+            self.fields.popitem(last=False)
+        return field
+
+    def clear(self):
+        self.fields.clear()
+
+# Shared cache used by the helpers below
+DEFAULT_CACHE = FieldCache()
+
+# Return the shortest path from pos to end as a list of (x, y) cells
+def path_from(maze, pos, end, cache=DEFAULT_CACHE):
+    return cache.get(maze, end).path_from(pos[0], pos[1])
+
+# Return the number of steps from pos to end, or -1 if end cannot be reached
+def distance_to(maze, pos, end, cache=DEFAULT_CACHE):
+    return cache.get(maze, end).distance(pos[0], pos[1])
+
+# Return the next cell to move to from pos towards end, or None
+def hint(maze, pos, end, cache=DEFAULT_CACHE):
+    return cache.get(maze, end).next_step(pos[0], pos[1])
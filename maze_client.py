@@ -0,0 +1,150 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# maze_client.py
+
+# talks to the maze service of maze_server.py, and load-tests it.
+
+# A MazeClient holds one connection and sends one request at a time, matching the way
+# the server serves a connection. generate(), solve() and hint() return the decoded
+# answers: a Grid with its entrance and exit, a path of (x, y) cells, and the next cell
+# with the distance to the exit.
+
+# load_test() opens a number of connections and keeps each of them busy for a fixed
+# number of requests. The requests are spread over a small set of hot seeds plus a
+# share of fresh seeds, so both the cache and the pool get exercised. It reports the
+# p50/p99 latency, requests per second and the count of busy and failed answers.
+
+# Usage:
+#   python maze_client.py --requests 2000 --connections 32 --size 101
+
+
+# Import the required libraries
+import argparse
+import asyncio
+import base64
+import json
+import random
+import time
+
+from maze_batch import decode_path
+from maze_grid import Grid
+from maze_server import DEFAULT_PORT
+
+# Raised when the service answers a request with an error
+class ServiceError(Exception):
+    pass
+
+# Define a class for a connection to the maze service
+class MazeClient:
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+
+    # Open a connection to the service
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=DEFAULT_PORT):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+    # Send one request and return the response, raising ServiceError on an error answer
+    async def request(self, op, **fields):
+        self.next_id += 1
+        fields.update(id=self.next_id, op=op)
+        self.writer.write(json.dumps(fields).encode() + b"\n")
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("the maze service closed the connection")
+        response = json.loads(line)
+        if "error" in response:
+            raise ServiceError(response["error"])
+        return response
+
+    # Return (Grid, entrance, exit) of a maze
+    async def generate(self, size, seed, algorithm="prim"):
+        response = await self.request("generate", size=size, seed=seed, algorithm=algorithm)
+        grid = Grid.from_walls(response["width"], response["height"], base64.b64decode(response["walls"]))
+        return grid, response["entrance"], response["exit"]
+
+    # Return the solution path of a maze from its entrance as (x, y) cells, empty without an exit
+    async def solve(self, size, seed, algorithm="prim", solver="bfs", entrance=(0, 1)):
+        response = await self.request("solve", size=size, seed=seed, algorithm=algorithm, solver=solver)
+        if not response["path_length"]:
+            return []
+        return decode_path(entrance, base64.b64decode(response["moves"]), response["path_length"])
+
+    # Return (next cell or None, steps to the exit or -1) from pos
+    async def hint(self, size, seed, pos, algorithm="prim"):
+        response = await self.request("hint", size=size, seed=seed, pos=list(pos), algorithm=algorithm)
+        return (tuple(response["next"]) if response["next"] else None), response["distance"]
+
+# Return the value below which the given fraction of the sorted samples fall
+def percentile(samples, fraction):
+    if not samples:
+        return None
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+# Send requests requests over connections connections and return the latency and throughput figures
+async def load_test(host="127.0.0.1", port=DEFAULT_PORT, requests=1000, connections=16, size=101,
+                    hot_seeds=8, fresh_share=0.1, seed=None):
+    if requests < 1 or connections < 1:
+        raise ValueError("a load test needs at least one request and one connection")
+    rng = random.Random(seed)
+    latencies = []
+    counts = {"ok": 0, "busy": 0, "errors": 0}
+    # Hand the requests out up front so every run of one seed sends the same load
+    plan = []
+    for _ in range(requests):
+        maze_seed = rng.getrandbits(32) if rng.random() < fresh_share else rng.randrange(hot_seeds)
+        op = rng.choice(("generate", "solve", "hint", "hint"))
+        fields = {"size": size, "seed": maze_seed}
+        if op == "hint":
+            fields["pos"] = [rng.randrange(size // 2) * 2 + 1, rng.randrange(size // 2) * 2 + 1]
+        plan.append((op, fields))
+
+    async def worker(share):
+        client = await MazeClient.connect(host, port)
+        try:
+            for op, fields in share:
+                started = time.perf_counter()
+                try:
+                    await client.request(op, **fields)
+                    counts["ok"] += 1
+                except ServiceError as error:
+                    counts["busy" if str(error) == "busy" else "errors"] += 1
+                latencies.append(time.perf_counter() - started)
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(plan[i::connections]) for i in range(connections)))
+    seconds = time.perf_counter() - started
+    latencies.sort()
+    return dict(counts, requests=requests, connections=connections, seconds=seconds,
+                requests_per_second=requests / seconds if seconds else None,
+                p50_ms=percentile(latencies, 0.50) * 1000, p99_ms=percentile(latencies, 0.99) * 1000)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the maze service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--size", type=int, default=101)
+    parser.add_argument("--hot-seeds", type=int, default=8, help="seeds most requests are spread over")
+    parser.add_argument("--fresh-share", type=float, default=0.1, help="share of requests on never-seen seeds")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    if args.requests < 1 or args.connections < 1:
+        parser.error("--requests and --connections must be at least 1")
+    report = asyncio.run(load_test(args.host, args.port, args.requests, args.connections, args.size,
+                                   args.hot_seeds, args.fresh_share, args.seed))
+    print("%(requests)d requests over %(connections)d connections in %(seconds).2f s" % report)
+    print("  %(requests_per_second).0f req/s, p50 %(p50_ms).2f ms, p99 %(p99_ms).2f ms" % report)
+    print("  ok %(ok)d, busy %(busy)d, errors %(errors)d" % report)
@@ -0,0 +1,236 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# maze_dynamic.py
+
+# lets walls open and close on a live maze while agents keep moving through it, and
+# repairs their paths incrementally instead of solving again from scratch.
+
+# A DynamicMaze wraps the Grid being played. open_wall(), close_wall() and set_wall()
+# edit cells in place. Each edit drops the grid's cached indexes (grid.invalidate()) and
+# tells every planner subscribed to the maze which cell changed.
+
+# A DStarLite planner (Koenig and Likhachev's D* Lite) searches backwards from the goal
+# and keeps its search tree between calls: g is the distance to the goal each cell had
+# at its last expansion, rhs the one-step lookahead from its neighbors, and a cell is
+# queued only while the two disagree. When a wall changes, only the changed cell and its
+# neighbors are re-evaluated, and the repair spreads only as far as distances actually
+# change. Replanning therefore costs in proportion to the size of the change, not of the
+# maze. move_to() follows the agent as it walks; the key modifier km keeps the queued
+# keys valid without re-sorting the queue. With a fixed start, this is LPA*.
+
+# Only WALL cells block, as in maze_solver.solve, so the walker's marks do not matter.
+
+
+# Import the required libraries
+import heapq
+
+from maze_grid import Grid, neighbor_indices
+from maze_solver import CellType, flatten
+
+INF = float("inf")
+
+# Define a class for a maze whose walls change during a run
+class DynamicMaze:
+
+    # Wrap a live Grid (other mazes are copied into one)
+    def __init__(self, maze):
+        if not isinstance(maze, Grid):
+            cells, width, height = flatten(maze)
+            maze = Grid(width, height, buffer=bytearray(cells))
+        self.grid = maze
+        self.width = maze.width
+        self.height = maze.height
+        self.planners = []
+        self.version = 0
+
+    # Return whether cell (x, y) is a wall
+    def is_wall(self, x, y):
+        return self.grid.cells[y * self.width + x] == CellType.WALL
+
+    # Make cell (x, y) a wall or a road; return whether anything changed
+    def set_wall(self, x, y, wall=True):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise ValueError("position (%s, %s) is outside the maze" % (x, y))
+        idx = y * self.width + x
+        if (self.grid.cells[idx] == CellType.WALL) == wall:
+            return False
+        self.grid.cells[idx] = CellType.WALL if wall else CellType.ROAD
+        self.grid.invalidate()
+        self.version += 1
+        for planner in self.planners:
+            planner.changed.append(idx)
+        return True
+
+    def open_wall(self, x, y):
+        return self.set_wall(x, y, False)
+
+    def close_wall(self, x, y):
+        return self.set_wall(x, y, True)
+
+    # Return a D* Lite planner from start to goal that follows the edits of this maze
+    def planner(self, start, goal):
+        return DStarLite(self, start, goal)
+
+# Define a class for the D* Lite incremental planner
+class DStarLite:
+
+    def __init__(self, dynamic, start, goal):
+        self.dynamic = dynamic
+        self.cells = dynamic.grid.cells
+        self.width = dynamic.width
+        count = len(self.cells)
+        self.start = self._index(start)
+        self.goal = self._index(goal)
+        self.g = [INF] * count
+        self.rhs = [INF] * count
+        self.rhs[self.goal] = 0
+        self.km = 0
+        # Queued cells with their current key; heap entries whose key differs are stale
+        self.open = {}
+        self.heap = []
+        self._push(self.goal)
+        # Cells changed since the last replan, filled in by DynamicMaze.set_wall()
+        self.changed = []
+        # Cells expanded by the last plan() call, to see what a replan cost
+        self.expanded = 0
+        dynamic.planners.append(self)
+
+    # Stop following the edits of the maze
+    def close(self):
+        if self in self.dynamic.planners:
+            self.dynamic.planners.remove(self)
+
+    # Return the flat index of an (x, y) cell inside the maze
+    def _index(self, pos):
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.dynamic.height):
+            raise ValueError("position (%s, %s) is outside the maze" % (x, y))
+        return y * self.width + x
+
+    # Return the open neighbors of a cell (none for a wall, which no edge can reach)
+    def _neighbors(self, idx):
+        cells, width = self.cells, self.width
+        if cells[idx] == CellType.WALL:
+            return ()
+        return [n for n in neighbor_indices(idx, width, len(cells)) if cells[n] != CellType.WALL]
+
+    # Manhattan distance between the start and a cell
+    def _h(self, idx):
+        width, start = self.width, self.start
+        return abs(idx % width - start % width) + abs(idx // width - start // width)
+
+    def _key(self, idx):
+        best = min(self.g[idx], self.rhs[idx])
+        return (best + self._h(idx) + self.km, best)
+
+    def _push(self, idx):
+        key = self._key(idx)
+        self.open[idx] = key
+        heapq.heappush(self.heap, (key[0], key[1], idx))
+
+    # Drop stale entries and return the top (key, cell) of the queue, or None
+    def _top(self):
+        heap, open = self.heap, self.open
+        while heap:
+            k1, k2, idx = heap[0]
+            if open.get(idx) == (k1, k2):
+                return (k1, k2), idx
+            heapq.heappop(heap)
+        return None
+
+    # Recompute the lookahead of a cell and queue it if it became inconsistent
+    def _update(self, idx):
+        if idx != self.goal:
+            g = self.g
+            self.rhs[idx] = min((g[n] + 1 for n in self._neighbors(idx)), default=INF)
+        self.open.pop(idx, None)
+        if self.g[idx] != self.rhs[idx]:
+            self._push(idx)
+
+    # Expand inconsistent cells until the start is consistent and nothing queued can improve it
+    def _compute(self):
+        g, rhs = self.g, self.rhs
+        expanded = 0
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            key, idx = top
+            if key >= self._key(self.start) and rhs[self.start] == g[self.start]:
+                break
+            heapq.heappop(self.heap)
+            expanded += 1
+            new_key = self._key(idx)
+            if key < new_key:
+                self._push(idx)
+            elif g[idx] > rhs[idx]:
+                g[idx] = rhs[idx]
+                del self.open[idx]
+                for n in self._neighbors(idx):
+                    self._update(n)
+            else:
+                g[idx] = INF
+                self._update(idx)
+                for n in self._neighbors(idx):
+                    self._update(n)
+        self.expanded = expanded
+
+    # Re-evaluate the cells around the walls changed since the last call
+    def _apply_changes(self):
+        changed, self.changed = self.changed, []
+        width, count = self.width, len(self.cells)
+        for idx in set(changed):
+            # A closed cell loses its edges, so its former neighbors are rechecked too
+            self._update(idx)
+            for n in neighbor_indices(idx, width, count):
+                self._update(n)
+
+    # Tell the planner the agent now stands on pos
+    def move_to(self, pos):
+        idx = self._index(pos)
+        self.km += self._h(idx)
+        self.start = idx
+
+    # Repair the search after any wall edits and return the shortest path from the start
+    # to the goal as a list of (x, y) cells, empty when the goal cannot be reached
+    def plan(self):
+        self._apply_changes()
+        self._compute()
+        g, width = self.g, self.width
+        idx = self.start
+        if g[idx] == INF or self.cells[idx] == CellType.WALL:
+            return []
+        path = [(idx % width, idx // width)]
+        while idx != self.goal:
+            idx = min(self._neighbors(idx), key=g.__getitem__)
+            if g[idx] == INF or len(path) > len(g):
+                return []
+            path.append((idx % width, idx // width))
+        return path
+
+    # Steps from the start to the goal after the last plan(), or -1 when unreachable
+    def distance(self):
+        d = self.g[self.start]
+        return -1 if d == INF else d
+
+if __name__ == "__main__":
+    import random
+
+    from maze_generator import generate_maze
+    from maze_solver import solve
+
+    grid, entrance, exit = generate_maze(201, 201, seed=0)
+    maze = DynamicMaze(grid)
+    # Knock out some walls so that closing one on the path leaves a detour
+    rng = random.Random(0)
+    for _ in range(400):
+        maze.open_wall(rng.randrange(1, 100) * 2, rng.randrange(1, 100) * 2 - 1)
+    planner = maze.planner(entrance, exit)
+    path = planner.plan()
+    print("initial plan: %d steps, %d cells expanded" % (len(path), planner.expanded))
+    # Move the agent a few steps along the path, then block the path ahead of it
+    planner.move_to(path[10])
+    maze.close_wall(*path[len(path) // 2])
+    path = planner.plan()
+    print("after closing a wall: %d steps, %d cells expanded" % (len(path), planner.expanded))
+    print("solve() from scratch: %d steps, %d cells expanded" % tuple(map(len, solve(grid, path[0], exit))))
@@ -0,0 +1,246 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# maze_game.py
+
+# the maze game scene: it shows a random maze below a NEXT LEVEL header and animates the
+# solver walking it. It runs under the SceneManager of scene_manager.py, either inside the
+# main menu process (main.py) or on its own (puzzleinterphase.pyw).
+
+# On enter() the scene takes a random-sized maze from its level prefetcher (maze_prefetch.py)
+# and paints it. The prefetcher has already solved the level at full speed in the
+# background and recorded the run as a trace (maze_trace.py). The scene plays that trace
+# back: update() applies the steps due since the last frame and repaints only the cells
+# they changed. The display never waits on the solver.
+
+# Playback runs at any speed and can be seeked: [ and ] halve and double the speed, Space
+# pauses, Home and End jump to the start and the end, Page Up and Page Down jump back and
+# forward a tenth of the run. Seeking restores the nearest keyframe of the trace, so it
+# costs the same on any run.
+
+# Clicking NEXT LEVEL swaps in the next prefetched maze, while the prefetcher refills its
+# pool in the background. Escape returns to the scene below (the main menu). Every solved
+# level is appended as one run to the score database when its playback reaches the exit.
+# The mouse wheel, the arrow keys, +/- and F move the renderer's camera.
+
+
+# Import necessary libraries and modules
+import random
+import time
+
+import pygame
+
+# Import functions from other files
+from maze_prefetch import LevelPrefetcher
+from maze_renderer import MazeRenderer
+from maze_trace import TracePlayer
+import scores
+
+# Set window dimensions and other variables
+WIDTH = 400
+HEADER = 30
+HEIGHT = WIDTH + HEADER
+WINDOW = (WIDTH, HEIGHT)
+
+TITLE = "Maze Game"
+
+# Define some colors that will be used in the game
+COLOR_WHITE = (255, 255, 255)
+COLOR_BLACK = (0, 0, 0)
+
+# Set the font size used to center button labels
+FONT_SIZE = 16
+
+# Camera pan direction for each arrow key
+PAN_KEYS = {
+    pygame.K_LEFT: (-1, 0),
+    pygame.K_RIGHT: (1, 0),
+    pygame.K_UP: (0, -1),
+    pygame.K_DOWN: (0, 1),
+}
+
+# Playback jump for each seek key, as a share of the run
+SEEK_KEYS = {
+    pygame.K_HOME: -1,
+    pygame.K_END: 1,
+    pygame.K_PAGEUP: -0.1,
+    pygame.K_PAGEDOWN: 0.1,
+}
+
+# Seconds between two solver steps on screen at normal speed
+STEP_DELAY = 0.05
+
+# Fastest playback, in steps per second
+MAX_SPEED = 1 << 20
+
+# Frames changing more cells than this repaint the whole view instead of each cell
+REDRAW_CELLS = 512
+
+# Create a random maze size
+def random_maze_size(rng=random):
+    return rng.randint(5, 20) * 2 + 1
+
+# Number of levels kept ready by the prefetcher
+PREFETCH_LEVELS = 3
+
+# Append a solved run to the score database
+def record_solved(trace):
+    if trace is not None and trace.solved:
+        level, retries = random.randint(1, 49), random.choice([1, 5, 7, 3, 8, 6])
+        scores.record_run(level, retries, trace.solve_time)
+
+# Define a class for the maze game scene
+class MazeGame:
+    size = WINDOW
+    caption = TITLE
+
+    def __init__(self):
+        self.manager = None
+        self.screen = None
+        self.font = None
+        self.renderer = None
+        self.buttons = []
+        self.maze = self.entrance = self.exit = None
+        # Playback of the level's recorded solve: the player, the fractional step reached,
+        # the speed in steps per second and the time of the last frame
+        self.player = None
+        self.position = 0.0
+        self.speed = 1 / STEP_DELAY
+        self.paused = False
+        self.last_frame = None
+        self.recorded = False
+        # Levels are generated and solved ahead of time off the UI thread
+        self.prefetcher = LevelPrefetcher(random_maze_size, PREFETCH_LEVELS)
+
+    # Set up the screen, draw the first maze and start playing its solve
+    def enter(self, manager):
+        self.manager = manager
+        self.screen = manager.screen
+        self.font = pygame.font.Font(None, 36)
+        self.renderer = MazeRenderer(self.screen, 0, HEADER, WIDTH)
+        self.buttons = [{
+            'x': 2,
+            'y': 2,
+            'length': WIDTH - 4,
+            'height': HEADER - 4,
+            'click': self.refresh
+        }]
+        self.prefetcher.start()
+        self.refresh()
+        if manager.launch_started is not None:
+            manager.launch_latency = time.perf_counter() - manager.launch_started
+            manager.launch_started = None
+            if manager.debug:
+                print("First maze frame %.1f ms after the click" % (manager.launch_latency * 1000))
+
+    # Stop prefetching when the scene is closed
+    def leave(self):
+        self.prefetcher.stop()
+
+    # Define a function to draw a button with a given position, size, and text
+    def draw_button(self, x, y, len, height, text):
+        pygame.draw.rect(self.screen, COLOR_BLACK, [x, y, len, height], 1)
+        text_surface = self.font.render(text, True, COLOR_BLACK)
+        text_len = text.__len__() * FONT_SIZE
+        self.screen.blit(text_surface, (x + (len - text_len) / 2, y + 2))
+
+    # Draw the header and its NEXT LEVEL button
+    def draw_header(self):
+        pygame.draw.rect(self.screen, COLOR_WHITE, [0, 0, WIDTH, HEADER], 0)
+        self.draw_button(2, 2, WIDTH - 4, HEADER - 4, 'NEXT LEVEL')
+        pygame.display.update(pygame.Rect(0, 0, WIDTH, HEADER))
+
+    # Draw maze: a new maze is painted in full once, after that only the changed cells are
+    def draw_maze(self, maze, cur_pos, dirty=()):
+        if maze is not self.renderer.maze:
+            self.draw_header()
+        self.renderer.draw(maze, cur_pos, dirty)
+
+    # Return the playback cursor in the (value, x, y) form of the solver callback, or None
+    def cursor(self):
+        cell = self.player.cursor if self.player is not None else None
+        return (0, cell[0], cell[1]) if cell else None
+
+    # Refresh the maze: take the next prefetched random-sized maze, show it and play its solve
+    def refresh(self):
+        level = self.prefetcher.get()
+        self.maze, self.entrance, self.exit = level.maze, level.entrance, level.exit
+        self.player = TracePlayer(level.trace, level.maze) if level.trace is not None else None
+        self.position = 0.0
+        self.last_frame = time.perf_counter()
+        self.recorded = False
+        self.draw_maze(self.maze, self.cursor())
+
+    # Jump the playback to the given step and repaint the whole view
+    def seek(self, step):
+        if self.player is None:
+            return
+        self.player.seek(int(step))
+        self.position = self.player.step
+        self.renderer.redraw(self.maze, self.cursor())
+        self.check_solved()
+
+    # Record the run once its playback has reached the end
+    def check_solved(self):
+        if not self.recorded and self.player.finished:
+            self.recorded = True
+            record_solved(self.player.trace)
+
+    # Dispatcher
+    def dispatcher_click(self, pos):
+        for button in self.buttons:
+            x, y, length, height = button['x'], button['y'], button['length'], button['height']
+            pos_x, pos_y = pos
+            if x <= pos_x <= x + length and y <= pos_y <= y + height:
+                button['click']()
+
+    # Clicks go to the buttons, the mouse wheel zooms at the pointer, the arrow keys pan,
+    # +/- zoom, F fits the maze to the window, the playback keys change the speed or
+    # seek, and Escape leaves the game
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 4:
+                self.renderer.zoom(1, event.pos)
+            elif event.button == 5:
+                self.renderer.zoom(-1, event.pos)
+            else:
+                self.dispatcher_click(event.pos)
+        elif event.type == pygame.KEYDOWN:
+            step = max(1, self.renderer.span // 4)
+            if event.key == pygame.K_ESCAPE:
+                self.manager.pop()
+            elif event.key in PAN_KEYS:
+                dx, dy = PAN_KEYS[event.key]
+                self.renderer.pan(dx * step, dy * step)
+            elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                self.renderer.zoom(1)
+            elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                self.renderer.zoom(-1)
+            elif event.key == pygame.K_f:
+                self.renderer.fit()
+            elif event.key == pygame.K_SPACE:
+                self.paused = not self.paused
+            elif event.key == pygame.K_RIGHTBRACKET:
+                self.speed = min(MAX_SPEED, self.speed * 2)
+            elif event.key == pygame.K_LEFTBRACKET:
+                self.speed = max(1, self.speed / 2)
+            elif self.player is not None and event.key in SEEK_KEYS:
+                steps = self.player.trace.steps
+                self.seek(min(steps, max(0, self.player.step + SEEK_KEYS[event.key] * steps)))
+
+    # Play the steps due since the last frame. Only the cells they changed are repainted,
+    # unless there are so many that repainting the whole view is cheaper.
+    def update(self):
+        now = time.perf_counter()
+        elapsed, self.last_frame = now - self.last_frame, now
+        player = self.player
+        if player is None or player.finished or self.paused:
+            return
+        self.position = min(player.trace.steps, self.position + elapsed * self.speed)
+        changed = player.advance(int(self.position) - player.step)
+        if not changed:
+            return
+        if len(changed) > REDRAW_CELLS:
+            self.renderer.redraw(self.maze, self.cursor())
+        else:
+            self.draw_maze(self.maze, self.cursor(), changed)
+        self.check_solved()
@@ -1,4 +1,7 @@
-from random import randint, choice 
+import mmap
+import random
+import time
+from maze_grid import Grid
 # Define two classes for the two cell types and four directions
 class CellType:
     ROAD = 0  # A road cell
@@ -13,99 +16,172 @@ class Direction:
 # Define a class for the maze
 class Maze:
     
-    # Initialize the maze with given width and height
-    def __init__(self, width, height):
+    # Initialize the maze with given width and height, optionally on an existing grid
+    def __init__(self, width, height, grid=None):
         self.width = width
         self.height = height
-        # Create an empty maze with walls
-        self.maze = [[0 for x in range(self.width)] for y in range(self.height)]
+        # Create an empty compact grid, or check the one we were given
+        if grid is None:
+            grid = Grid(width, height)
+        elif grid.width != width or grid.height != height:
+            raise ValueError("grid is %dx%d, expected %dx%d" % (grid.width, grid.height, width, height))
+        self.maze = grid
     
-    # Reset all cells in the maze with the given value
+    # Reset all cells in the maze with the given value (Grid.fill() also drops the indexes
+    # of the old walls that a grid passed in may hold in grid.cache)
     def reset_maze(self, value):
-        for y in range(self.height):
-            for x in range(self.width):
-                self.set_maze(x, y, value)
+        self.maze.fill(CellType.ROAD if value == CellType.ROAD else CellType.WALL)
     
     # Set a cell in the maze at the given coordinate with the given value
     def set_maze(self, x, y, value):
         self.maze[y][x] = CellType.ROAD if value == CellType.ROAD else CellType.WALL
+        self.maze.invalidate()
     
     # Check if a cell in the maze has been visited (i.e., is not a wall cell)
     def visited(self, x, y):
         return self.maze[y][x] != 1
 
-def check_neighbors(maze, x, y, width, height, checklist):
-    # Create an empty list to store directions
-    directions = []
-
-    # Check if there is an unvisited cell to the left
-    if x > 0:
-        if not maze.visited(2 * (x - 1) + 1, 2 * y + 1):
-            # If there is an unvisited cell to the left, add LEFT direction to the list
-            directions.append(Direction.LEFT)
-
-    # Check if there is an unvisited cell above
-    if y > 0:
-        if not maze.visited(2 * x + 1, 2 * (y - 1) + 1):
-            # If there is an unvisited cell above, add UP direction to the list
-            directions.append(Direction.UP)
-
-    # Check if there is an unvisited cell to the right
-    if x < width - 1:
-        if not maze.visited(2 * (x + 1) + 1, 2 * y + 1):
-            # If there is an unvisited cell to the right, add RIGHT direction to the list
-            directions.append(Direction.RIGHT)
-
-    # Check if there is an unvisited cell below
-    if y < height - 1:
-        if not maze.visited(2 * x + 1, 2 * (y + 1) + 1):
-            # If there is an unvisited cell below, add DOWN direction to the list
-            directions.append(Direction.DOWN)
-
-    # Check if there is at least one direction in the list
-    if len(directions):
-        # Randomly choose a direction from the list
-        direction = choice(directions)
-
-        # Depending on the chosen direction, set the appropriate cells as ROAD and add the corresponding neighbor to the checklist
-        if direction == Direction.LEFT:
-            maze.set_maze(2 * (x - 1) + 1, 2 * y + 1, CellType.ROAD)
-            maze.set_maze(2 * x, 2 * y + 1, CellType.ROAD)
-            checklist.append((x - 1, y))
-        elif direction == Direction.UP:
-            maze.set_maze(2 * x + 1, 2 * (y - 1) + 1, CellType.ROAD)
-            maze.set_maze(2 * x + 1, 2 * y, CellType.ROAD)
-            checklist.append((x, y - 1))
-        elif direction == Direction.RIGHT:
-            maze.set_maze(2 * (x + 1) + 1, 2 * y + 1, CellType.ROAD)
-            maze.set_maze(2 * x + 2, 2 * y + 1, CellType.ROAD)
-            checklist.append((x + 1, y))
-        elif direction == Direction.DOWN:
-            maze.set_maze(2 * x + 1, 2 * (y + 1) + 1, CellType.ROAD)
-            maze.set_maze(2 * x + 1, 2 * y + 2, CellType.ROAD)
-            checklist.append((x, y + 1))
-
-        # Return True to indicate that a neighbor was added to the maze
-        return True
-
-    # Return False to indicate that no neighbor was added to the maze
-    return False
-
-
-
-def random_prime(map, width, height):
-    start_x, start_y = (randint(0, width - 1), randint(0, height - 1))
-    map.set_maze(2 * start_x + 1, 2 * start_y + 1, CellType.ROAD)
+# ______________________________GENERATION ENGINES______________________________
+# Every engine carves a perfect maze into the WALL-filled grid of a Maze object.
+# Cells live at odd grid coordinates (2 * x + 1, 2 * y + 1) for x < width, y < height,
+# and the engines work directly on the flat cell buffer of the grid, where moving one
+# cell left/right is an offset of 2 and moving one cell up/down is an offset of 2 * row.
+# An optional stats object (see maze_stats.Stats) receives the carved passage count and
+# the peak frontier size (Prim, backtracker) or the rejected wall count (Kruskal).
+# The streaming Eller generator below reports the same way.
+
+# Return the flat index of cell (x, y) and the moves (direction, offset to the neighbor
+# cell, offset to the wall in between) towards its unvisited neighbors
+def _cell_moves(cells, row, x, y, width, height):
+    idx = (2 * y + 1) * row + 2 * x + 1
+    moves = []
+    # Check the cells to the left, above, to the right and below
+    if x > 0 and cells[idx - 2] == CellType.WALL:
+        moves.append((Direction.LEFT, -2, -1))
+    if y > 0 and cells[idx - 2 * row] == CellType.WALL:
+        moves.append((Direction.UP, -2 * row, -row))
+    if x < width - 1 and cells[idx + 2] == CellType.WALL:
+        moves.append((Direction.RIGHT, 2, 1))
+    if y < height - 1 and cells[idx + 2 * row] == CellType.WALL:
+        moves.append((Direction.DOWN, 2 * row, row))
+    return idx, moves
+
+# Cell coordinate change for each direction
+DIRECTION_STEPS = {Direction.LEFT: (-1, 0), Direction.UP: (0, -1), Direction.RIGHT: (1, 0), Direction.DOWN: (0, 1)}
+
+# Randomized Prim: grow the maze from a random cell, carving from a random frontier entry.
+# Exhausted entries are dropped with an O(1) swap-remove instead of list.remove().
+def random_prime(map, width, height, rng=random, stats=None):
+    cells, row = map.maze.cells, map.width
+    start_x, start_y = rng.randrange(width), rng.randrange(height)
+    cells[(2 * start_y + 1) * row + 2 * start_x + 1] = CellType.ROAD
     checklist = [(start_x, start_y)]
-    while len(checklist):
-        entry = choice(checklist)
-        if not check_neighbors(map, entry[0], entry[1], width, height, checklist):
-            checklist.remove(entry)
+    carved = 0
+    while checklist:
+        if stats is not None:
+            stats.peak("peak_frontier", len(checklist))
+        i = rng.randrange(len(checklist))
+        x, y = checklist[i]
+        idx, moves = _cell_moves(cells, row, x, y, width, height)
+        if moves:
+            direction, to_cell, to_wall = moves[rng.randrange(len(moves))]
+            cells[idx + to_cell] = CellType.ROAD
+            cells[idx + to_wall] = CellType.ROAD
+            dx, dy = DIRECTION_STEPS[direction]
+            checklist.append((x + dx, y + dy))
+            carved += 1
+        else:
+            checklist[i] = checklist[-1]
+            checklist.pop()
+    if stats is not None:
+        stats.count("carved", carved)
+
+# Randomized Kruskal: open every cell, then knock down walls in random order whenever
+# they join two cells that are not yet connected, tracked with a union-find
+def kruskal(map, width, height, rng=random, stats=None):
+    cells, row = map.maze.cells, map.width
+    walls = []
+    for y in range(height):
+        base = (2 * y + 1) * row
+        for x in range(width):
+            cells[base + 2 * x + 1] = CellType.ROAD
+            cell = y * width + x
+            if x < width - 1:
+                walls.append((cell, cell + 1, base + 2 * x + 2))
+            if y < height - 1:
+                walls.append((cell, cell + width, base + row + 2 * x + 1))
+    rng.shuffle(walls)
+
+    parent = list(range(width * height))
+    # Find the root of a set, halving the path on the way
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    carved = 0
+    for a, b, wall in walls:
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_a] = root_b
+            cells[wall] = CellType.ROAD
+            carved += 1
+    if stats is not None:
+        stats.count("carved", carved)
+        stats.count("rejected_walls", len(walls) - carved)
 
+# Recursive backtracker, run with an explicit stack: walk to random unvisited neighbors
+# and back up when the current cell has none left
+def recursive_backtracker(map, width, height, rng=random, stats=None):
+    cells, row = map.maze.cells, map.width
+    start_x, start_y = rng.randrange(width), rng.randrange(height)
+    cells[(2 * start_y + 1) * row + 2 * start_x + 1] = CellType.ROAD
+    stack = [(start_x, start_y)]
+    carved = 0
+    while stack:
+        x, y = stack[-1]
+        idx, moves = _cell_moves(cells, row, x, y, width, height)
+        if moves:
+            direction, to_cell, to_wall = moves[rng.randrange(len(moves))]
+            cells[idx + to_cell] = CellType.ROAD
+            cells[idx + to_wall] = CellType.ROAD
+            dx, dy = DIRECTION_STEPS[direction]
+            stack.append((x + dx, y + dy))
+            carved += 1
+            if stats is not None:
+                stats.peak("peak_frontier", len(stack))
+        else:
+            stack.pop()
+    if stats is not None:
+        stats.count("carved", carved)
 
-def do_random_prime(map):
-    map.reset_maze(CellType.WALL)
-    random_prime(map, (map.width - 1) // 2, (map.height - 1) // 2)
+# Registered generation engines, by name
+GENERATORS = {
+    "prim": random_prime,
+    "kruskal": kruskal,
+    "backtracker": recursive_backtracker,
+}
+
+# Fill the maze with walls and carve it with the named engine, timing both phases into stats if given
+def do_generate(map, algorithm="prim", rng=random, stats=None):
+    try:
+        engine = GENERATORS[algorithm]
+    except KeyError:
+        raise ValueError("unknown algorithm %r, expected one of %s" % (algorithm, ", ".join(sorted(GENERATORS))))
+    if stats is None:
+        map.reset_maze(CellType.WALL)
+        engine(map, (map.width - 1) // 2, (map.height - 1) // 2, rng)
+        return
+    with stats.timer("reset"):
+        map.reset_maze(CellType.WALL)
+    with stats.timer("carve_" + algorithm):
+        engine(map, (map.width - 1) // 2, (map.height - 1) // 2, rng, stats)
+    stats.count("generated")
+
+
+def do_random_prime(map, rng=random):
+    do_generate(map, "prim", rng)
 
 
 def set_entrance_exit(maze):
@@ -125,16 +201,130 @@ def set_entrance_exit(maze):
     return entrance, exit
 
 
-def generate_maze(width=21, height=21):
-    # Create a maze object and generate a maze
-    maze = Maze(width, height)
-    do_random_prime(maze)
+def generate_maze(width=21, height=21, grid=None, algorithm="prim", seed=None, stats=None):
+    # Create a maze object (on the given grid, if any) and generate a maze with the
+    # named engine; the same seed always produces the same maze
+    maze = Maze(width, height, grid)
+    do_generate(maze, algorithm, random.Random(seed), stats)
 
     # Find the entrance and exit of the maze
+    started = time.perf_counter()
     entrance, exit = set_entrance_exit(maze)
+    if stats is not None:
+        stats.add_time("entrance_exit", time.perf_counter() - started)
     
-    # Return the maze as a 2D array, along with the entrance and exit coordinates
+    # Return the maze as a compact Grid (use grid.to_list() for a 2D list), along with the entrance and exit coordinates
     return maze.maze, entrance, exit
 
+# ______________________________STREAMING GENERATION______________________________
+# Eller's algorithm builds the maze one cell row at a time and only keeps the set
+# membership of the current row, so memory stays O(width) however tall the maze is.
+# stream_maze yields the grid rows top to bottom, write_maze_stream sends them to a
+# file or memory map, and open_maze_stream maps such a file back as a Grid.
+
+# Return the entrance and exit that set_entrance_exit picks for a width x height maze.
+# Cell (0, 0) is always carved, so the entrance is on row 1; the exit sits on the last
+# cell row when the rightmost grid column but one holds cells, and is missing otherwise.
+def stream_entrance_exit(width, height):
+    entrance = [0, 1]
+    exit = []
+    if width % 2 == 1:
+        exit = [width - 1, 2 * ((height - 1) // 2) - 1]
+    return entrance, exit
+
+# Yield the rows of a width x height maze generated with Eller's algorithm, entrance
+# and exit included, as bytearrays of width cells. The optional stats object receives the
+# carved passage count, the peak number of open sets in a row and the time spent carving
+# (carve_eller, not counting the time the consumer holds each row), once the last row is out.
+def stream_maze(width=21, height=21, seed=None, stats=None):
+    rng = random.Random(seed)
+    cols, rows = (width - 1) // 2, (height - 1) // 2
+    (entrance_x, entrance_y), exit = stream_entrance_exit(width, height)
+    wall_row = bytes([CellType.WALL]) * width
+
+    # Set id of each cell in the current row (None for a fresh cell) and the columns of each set
+    sets = [None] * cols
+    members = {}
+    next_id = 0
+    carved = 0
+    elapsed = 0.0
+
+    yield bytearray(wall_row)
+    for y in range(rows):
+        started = time.perf_counter()
+        last = y == rows - 1
+        for x in range(cols):
+            if sets[x] is None:
+                sets[x] = next_id
+                members[next_id] = [x]
+                next_id += 1
+
+        # Carve the cells, then join neighbors from different sets (always on the last row)
+        line = bytearray(wall_row)
+        line[1:2 * cols:2] = bytes([CellType.ROAD]) * cols
+        for x in range(cols - 1):
+            a, b = sets[x], sets[x + 1]
+            if a != b and (last or rng.random() < 0.5):
+                line[2 * x + 2] = CellType.ROAD
+                carved += 1
+                # Relabel the smaller set into the larger one
+                if len(members[a]) < len(members[b]):
+                    a, b = b, a
+                for col in members[b]:
+                    sets[col] = a
+                members[a].extend(members.pop(b))
+        if 2 * y + 1 == entrance_y:
+            line[entrance_x] = CellType.ROAD
+        if exit and 2 * y + 1 == exit[1]:
+            line[exit[0]] = CellType.ROAD
+        elapsed += time.perf_counter() - started
+        yield line
+        started = time.perf_counter()
+
+        # Open at least one passage down from every set; cells below without one start fresh
+        below = bytearray(wall_row)
+        next_sets = [None] * cols
+        next_members = {}
+        if not last:
+            for set_id, cols_in_set in members.items():
+                down = [col for col in cols_in_set if rng.random() < 0.5]
+                if not down:
+                    down = [cols_in_set[rng.randrange(len(cols_in_set))]]
+                for col in down:
+                    below[2 * col + 1] = CellType.ROAD
+                    next_sets[col] = set_id
+                next_members[set_id] = down
+                carved += len(down)
+            if stats is not None:
+                stats.peak("peak_sets", len(members))
+        sets, members = next_sets, next_members
+        elapsed += time.perf_counter() - started
+        yield below
+
+    # Pad with wall rows when the height leaves room below the last wall row
+    for _ in range(height - 2 * rows - 1):
+        yield bytearray(wall_row)
+    if stats is not None:
+        stats.add_time("carve_eller", elapsed)
+        stats.count("carved", carved)
+        stats.count("generated")
+
+# Stream a maze into a binary file (path or file object) or a writable memory map, as
+# height rows of width raw cell bytes, and return its entrance and exit coordinates
+def write_maze_stream(out, width=21, height=21, seed=None, stats=None):
+    if isinstance(out, str):
+        with open(out, "wb") as file:
+            return write_maze_stream(file, width, height, seed, stats)
+    for line in stream_maze(width, height, seed, stats):
+        out.write(line)
+    return stream_entrance_exit(width, height)
+
+# Memory-map a file written by write_maze_stream and wrap it as a Grid without reading it
+def open_maze_stream(path, width, height, writable=False):
+    with open(path, "r+b" if writable else "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+    return Grid(width, height, buffer=buffer)
+
 if __name__ == "__main__":
-    print(generate_maze())
+    maze, entrance, exit = generate_maze()
+    print((maze.to_list(), entrance, exit))
@@ -0,0 +1,292 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# maze_graph.py
+
+# builds a junction graph of a maze: every open cell that is not a plain corridor cell
+# (a junction, a dead end, the entrance or the exit) becomes a node, and each corridor
+# between two nodes becomes a single edge weighted by its length in steps.
+
+# Every engine of maze_solver has a graph counterpart here (bfs becomes Dijkstra since
+# the edges are weighted), and paths are expanded back to cells only once a route has been
+# found, by walking the corridors. How much the graph saves depends on the generator. A
+# backtracker maze is mostly long corridors, so about 10% of its open cells are nodes.
+# Prim and Kruskal mazes branch at almost every cell, so more than 25% are nodes, and half
+# of those are dead ends. The search engines therefore run on the core edges, which leave
+# out the corridors into dead ends; a route can only use those at its start or end. On
+# 2001x2001 mazes, a query on a built index is about 2x faster than bfs for Prim and
+# Kruskal and about 4x faster for the backtracker. Building the index costs a few
+# cell-by-cell searches, so it pays off only for mazes queried many times.
+
+# A start or end cell in the middle of a corridor is spliced in for the query only, as a
+# temporary node with edges to both ends of its corridor, and a dead-end start or end gets
+# its corridor back. These temporary edges are laid over the stored ones, which are never
+# copied or modified.
+
+# graph_index(maze) builds the graph once per Grid and keeps it in grid.cache, so repeated
+# queries reuse it; generating a new maze into the grid drops it. A list-of-lists maze is
+# indexed again on every call. A corridor walk that never reaches its end means the walls
+# were changed without grid.invalidate(), and raises ValueError instead of spinning.
+
+
+# Import the required libraries
+import heapq
+import time
+
+from maze_solver import ALGORITHMS, CellType, SolveResult, open_neighbors, flatten, record_search
+
+# Define a class for the junction graph
+class JunctionGraph:
+
+    # Build the graph from a flat cell buffer
+    def __init__(self, cells, width, height):
+        self.cells = cells
+        self.width = width
+        self.height = height
+        # Node -> list of (neighbor node, corridor length, first cell of the corridor)
+        self.edges = {}
+        for idx in range(len(cells)):
+            if cells[idx] != CellType.WALL:
+                neighbors = open_neighbors(cells, width, idx)
+                if len(neighbors) != 2:
+                    self.edges[idx] = neighbors
+        for node, neighbors in self.edges.items():
+            self.edges[node] = [self.follow(node, first)[:2] + (first,) for first in neighbors]
+        # The same edges without the corridors into dead ends, which no route passes through
+        # unless it starts or ends there; query_edges() adds those back for the query's ends
+        self.dead_ends = {node for node, out in self.edges.items() if len(out) == 1}
+        self.core = {node: [edge for edge in out if edge[0] not in self.dead_ends]
+                     for node, out in self.edges.items() if node not in self.dead_ends}
+
+    # Number of nodes and of (undirected) edges
+    @property
+    def size(self):
+        return len(self.edges), sum(len(out) for out in self.edges.values()) // 2
+
+    # Return the corridor cell after cur when coming from prev. A corridor cell always has
+    # a second way out; when it has none, the walls changed after the graph was built.
+    def _step(self, prev, cur):
+        for n in open_neighbors(self.cells, self.width, cur):
+            if n != prev:
+                return n
+        raise ValueError("corridor at cell %d ends in a dead end the graph does not know; "
+                         "call grid.invalidate() after changing walls" % cur)
+
+    # Walk the corridor entered from cell a through cell first until reaching a node or a
+    # cell of stops. Return (end cell, length, last cell before the end).
+    def follow(self, a, first, stops=()):
+        edges, limit = self.edges, len(self.cells)
+        prev, cur, length = a, first, 1
+        while cur not in edges and cur not in stops:
+            prev, cur = cur, self._step(prev, cur)
+            length += 1
+            if cur == a:
+                break
+            if length > limit:
+                raise ValueError("corridor from cell %d never reaches a node; the maze changed after the graph was built" % a)
+        return cur, length, prev
+
+    # Return the cells of the corridor from a through first to b, a excluded and b included
+    def corridor(self, a, first, b):
+        out = [first]
+        prev, cur, limit = a, first, len(self.cells)
+        while cur != b:
+            prev, cur = cur, self._step(prev, cur)
+            out.append(cur)
+            if len(out) > limit:
+                raise ValueError("corridor from cell %d never reaches cell %d; the maze changed after the graph was built" % (a, b))
+        return out
+
+    # Return the edges of a query: the stored ones plus temporary edges splicing in start
+    # and end when they lie inside a corridor. With prune=True the dead-end corridors are
+    # left out, except those leading to start or end.
+    def query_edges(self, start, end, prune=False):
+        extra = {}
+        spliced = set()
+        for cell in (start, end):
+            if prune and cell in self.dead_ends and cell not in extra:
+                for node, length, first in self.edges[cell]:
+                    extra.setdefault(cell, []).append((node, length, first))
+                    extra.setdefault(node, []).extend(edge for edge in self.edges[node] if edge[0] == cell)
+                continue
+            if cell in self.edges or cell in spliced:
+                continue
+            spliced.add(cell)
+            for first in open_neighbors(self.cells, self.width, cell):
+                node, length, last = self.follow(cell, first, spliced)
+                if node == cell:
+                    continue
+                extra.setdefault(cell, []).append((node, length, first))
+                extra.setdefault(node, []).append((cell, length, last if length > 1 else cell))
+        edges = self.core if prune else self.edges
+        return _QueryEdges(edges, extra) if extra else edges
+
+    # Expand a chain of (node, first cell of the corridor to the next node) into cells
+    def expand(self, start, hops):
+        path = [start]
+        for a, first, b in hops:
+            path.extend(self.corridor(a, first, b))
+        return path
+
+# The stored edges of a graph seen together with the temporary edges of one query,
+# without copying the stored ones
+class _QueryEdges:
+
+    def __init__(self, edges, extra):
+        self.edges = edges
+        self.extra = extra
+
+    def get(self, node, default=()):
+        out = self.edges.get(node)
+        more = self.extra.get(node)
+        if more:
+            return out + more if out else more
+        return default if out is None else out
+
+# Follow prev links (node -> (parent, first cell from parent)) back from node into hops
+def _hops(prev, node):
+    hops = []
+    while prev[node] is not None:
+        parent, first = prev[node]
+        hops.append((parent, first, node))
+        node = parent
+    hops.reverse()
+    return hops
+
+# Dijkstra's algorithm over the corridor-weighted edges
+def _dijkstra(graph, edges, start, goal, stats=None, heuristic=None):
+    dist = {start: 0}
+    prev = {start: None}
+    expanded = []
+    heap = [(heuristic(start) if heuristic else 0, 0, start)]
+    heappush, heappop, out_edges, best = heapq.heappush, heapq.heappop, edges.get, dist.get
+    while heap:
+        if stats is not None:
+            stats.peak("peak_frontier", len(heap))
+        _, d, node = heappop(heap)
+        # An entry whose distance has been improved since it was pushed is stale
+        if d > dist[node]:
+            continue
+        expanded.append(node)
+        if node == goal:
+            return graph.expand(start, _hops(prev, goal)), expanded
+        for n, length, first in out_edges(node, ()):
+            nd = d + length
+            if nd < best(n, nd + 1):
+                dist[n] = nd
+                prev[n] = (node, first)
+                heappush(heap, (nd + heuristic(n) if heuristic else nd, nd, n))
+    return [], expanded
+
+# A* over the graph; the Manhattan distance stays admissible since a corridor is never
+# shorter than the distance between its ends
+def _astar(graph, edges, start, goal, stats=None):
+    width = graph.width
+    gx, gy = goal % width, goal // width
+    return _dijkstra(graph, edges, start, goal, stats, lambda n: abs(n % width - gx) + abs(n // width - gy))
+
+# Bidirectional Dijkstra, stopping once the two frontiers can no longer improve the best meeting
+def _bidirectional(graph, edges, start, goal, stats=None):
+    if start == goal:
+        return [start], [start]
+    dist = ({start: 0}, {goal: 0})
+    prev = ({start: None}, {goal: None})
+    closed = (set(), set())
+    heaps = ([(0, start)], [(0, goal)])
+    expanded = []
+    best, meet = None, None
+    while heaps[0] and heaps[1]:
+        if best is not None and heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+        if stats is not None:
+            stats.peak("peak_frontier", len(heaps[0]) + len(heaps[1]))
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        d, node = heapq.heappop(heaps[side])
+        if node in closed[side]:
+            continue
+        closed[side].add(node)
+        expanded.append(node)
+        for n, length, first in edges.get(node, ()):
+            nd = d + length
+            if nd < dist[side].get(n, nd + 1):
+                dist[side][n] = nd
+                prev[side][n] = (node, first)
+                heapq.heappush(heaps[side], (nd, n))
+            if n in dist[1 - side]:
+                total = dist[side][n] + dist[1 - side][n]
+                if best is None or total < best:
+                    best, meet = total, n
+    if meet is None:
+        return [], expanded
+    path = graph.expand(start, _hops(prev[0], meet))
+    # The backward tree runs from the goal, so its corridors are walked goal-side first and reversed
+    for parent, first, node in reversed(_hops(prev[1], meet)):
+        path.extend(list(reversed([parent] + graph.corridor(parent, first, node)))[1:])
+    return path, expanded
+
+# Depth-first walk over the graph, taking corridors in the walker's top/right/down/left
+# order and backing out of dead ends
+def _walker(graph, edges, start, goal, stats=None):
+    prev = {start: None}
+    expanded = [start]
+    stack = [(start, iter(edges.get(start, ())))]
+    while stack:
+        if stats is not None:
+            stats.peak("peak_frontier", len(stack))
+        node, out = stack[-1]
+        if node == goal:
+            return graph.expand(start, _hops(prev, goal)), expanded
+        for n, length, first in out:
+            if n not in prev:
+                prev[n] = (node, first)
+                expanded.append(n)
+                stack.append((n, iter(edges.get(n, ()))))
+                break
+        else:
+            stack.pop()
+    return [], expanded
+
+# Graph counterparts of the maze_solver engines, by name
+GRAPH_ALGORITHMS = {
+    "bfs": _dijkstra,
+    "astar": _astar,
+    "bidirectional": _bidirectional,
+    # Breadth-first by bitboards on cells is still breadth-first, which is Dijkstra on the graph
+    "bitboard": _dijkstra,
+    "walker": _walker,
+}
+
+# Return the junction graph of a maze, cached on Grid instances
+def graph_index(maze):
+    cache = getattr(maze, "cache", None)
+    if cache is not None and "junction_graph" in cache:
+        return cache["junction_graph"]
+    graph = JunctionGraph(*flatten(maze))
+    if cache is not None:
+        cache["junction_graph"] = graph
+    return graph
+
+# Find a path from start to end on the junction graph of the maze and return a SolveResult
+# whose expanded list holds the graph nodes visited
+def solve_indexed(maze, start, end, algorithm="bfs", stats=None):
+    if algorithm not in ALGORITHMS:
+        raise ValueError("unknown algorithm %r, expected one of %s" % (algorithm, ", ".join(sorted(ALGORITHMS))))
+    if stats is not None and "junction_graph" not in getattr(maze, "cache", ()):
+        with stats.timer("index_build"):
+            graph = graph_index(maze)
+    else:
+        graph = graph_index(maze)
+    width = graph.width
+    for x, y in (start, end):
+        if not (0 <= x < width and 0 <= y < graph.height) or graph.cells[y * width + x] == CellType.WALL:
+            raise ValueError("position (%s, %s) is not an open cell of the maze" % (x, y))
+    a, b = start[1] * width + start[0], end[1] * width + end[0]
+    started = time.perf_counter()
+    # The walker mirrors the cell walker, dead ends included; the other engines skip them
+    edges = graph.query_edges(a, b, prune=algorithm != "walker")
+    path, expanded = GRAPH_ALGORITHMS[algorithm](graph, edges, a, b, stats)
+    if stats is not None:
+        record_search(stats, "indexed_" + algorithm, path, expanded, time.perf_counter() - started)
+    return SolveResult(
+        [(idx % width, idx // width) for idx in path],
+        [(idx % width, idx // width) for idx in expanded],
+    )
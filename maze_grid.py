@@ -0,0 +1,141 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# maze_grid.py
+
+# defines the Grid class, a compact maze grid that stores one byte per cell in a single
+# flat bytearray, indexed by y * width + x. A 4001x4001 maze takes 16 MB instead of the
+# 100+ MB of a list of lists of Python ints.
+
+# grid[y] returns a memoryview of row y, so grid[y][x] reads and writes cells exactly like
+# the list of lists used elsewhere in the project, without copying the row. column(x)
+# returns a strided memoryview of column x. len(grid) is the number of rows.
+
+# pack_walls() squeezes the grid to one bit per cell (set for walls) and Grid.from_walls()
+# rebuilds a grid from such bits, for compact transfer and storage.
+
+# grid.cache holds indexes derived from the wall layout, such as the junction graph of
+# maze_graph and the content hash of maze_cache. Solver states do not affect them. fill()
+# drops them, and so does every generator writing into the grid; after changing walls by
+# hand call invalidate().
+
+# When NumPy is installed, as_array() returns a (height, width) uint8 array that shares
+# memory with the grid. to_list() and Grid.from_list() convert to and from a list of lists
+# for callers that need one.
+
+
+# Import the required libraries
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Byte translation tables between cell values and the ASCII "0"/"1" digits used for bit packing
+_TO_WALL_DIGIT = bytes(ord("1") if value == 1 else ord("0") for value in range(256))
+_FROM_WALL_DIGIT = bytes(1 if value == ord("1") else 0 for value in range(256))
+
+# Translation table that keeps walls and turns every solver state back into a road
+WALLS_ONLY = bytes(1 if value == 1 else 0 for value in range(256))
+
+# Return the flat indices of the up, right, down and left neighbors of cell idx, in that
+# order, leaving out those outside a grid of the given width and cell count
+def neighbor_indices(idx, width, count):
+    x = idx % width
+    # Cells off the border, nearly all of them, have all four
+    if 0 < x < width - 1 and width <= idx < count - width:
+        return idx - width, idx + 1, idx + width, idx - 1
+    return tuple(n for n in (idx - width, idx + 1 if x + 1 < width else -1, idx + width, idx - 1 if x > 0 else -1)
+                 if 0 <= n < count)
+
+# Define a class for the compact grid
+class Grid:
+
+    # Initialize the grid with the given width and height, filled with the given value.
+    # An existing buffer (bytearray, mmap, ...) of width * height bytes can be wrapped instead.
+    def __init__(self, width, height, fill=0, buffer=None):
+        self.width = width
+        self.height = height
+        if buffer is None:
+            buffer = bytearray([fill]) * (width * height)
+        elif len(buffer) != width * height:
+            raise ValueError("buffer holds %d cells, expected %d" % (len(buffer), width * height))
+        self.cells = buffer
+        # Indexes derived from the wall layout (see maze_graph), dropped by invalidate()
+        self.cache = {}
+        # Pre-slice one memoryview per row so row access is a plain list lookup
+        view = memoryview(buffer)
+        self._rows = [view[y * width:(y + 1) * width] for y in range(height)]
+
+    # Build a grid from a list of lists of cell values
+    @classmethod
+    def from_list(cls, rows):
+        height = len(rows)
+        width = len(rows[0]) if height else 0
+        return cls(width, height, buffer=bytearray().join(bytes(row) for row in rows))
+
+    # Build a grid from the bytes returned by pack_walls(); every cell is a WALL or a road
+    @classmethod
+    def from_walls(cls, width, height, data):
+        count = width * height
+        digits = format(int.from_bytes(data, "big"), "0%db" % (len(data) * 8))[:count]
+        return cls(width, height, buffer=bytearray(digits.encode("ascii").translate(_FROM_WALL_DIGIT)))
+
+    def __len__(self):
+        return self.height
+
+    # Return a writable view of row y
+    def __getitem__(self, y):
+        return self._rows[y]
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __repr__(self):
+        return "Grid(%d, %d)" % (self.width, self.height)
+
+    # Return a writable view of row y
+    def row(self, y):
+        return self._rows[y]
+
+    # Return a writable strided view of column x
+    def column(self, x):
+        return memoryview(self.cells)[x::self.width]
+
+    # Read the cell at the given coordinate
+    def get(self, x, y):
+        return self.cells[y * self.width + x]
+
+    # Set the cell at the given coordinate to the given value
+    def set(self, x, y, value):
+        self.cells[y * self.width + x] = value
+
+    # Set every cell to the given value
+    def fill(self, value):
+        self.cells[:] = bytes([value]) * len(self.cells)
+        self.invalidate()
+
+    # Drop the cached indexes after walls have been opened or closed
+    def invalidate(self):
+        self.cache.clear()
+
+    # Return an independent copy of the grid
+    def copy(self):
+        return Grid(self.width, self.height, buffer=bytearray(self.cells))
+
+    # Pack the grid to one bit per cell, most significant bit first, set for WALL cells
+    # and clear for everything else (solver states are dropped)
+    def pack_walls(self):
+        digits = bytes(self.cells).translate(_TO_WALL_DIGIT)
+        if not digits:
+            return b""
+        padding = -len(digits) % 8
+        return int(digits + b"0" * padding, 2).to_bytes((len(digits) + padding) // 8, "big")
+
+    # Return the grid as a list of lists of ints
+    def to_list(self):
+        return [list(row) for row in self._rows]
+
+    # Return a NumPy view of the grid that shares its memory
+    def as_array(self):
+        if numpy is None:
+            raise RuntimeError("NumPy is not installed")
+        return numpy.frombuffer(self.cells, dtype=numpy.uint8).reshape(self.height, self.width)
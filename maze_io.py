@@ -0,0 +1,180 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# maze_io.py
+
+# saves mazes in a compact binary format and loads them back through a memory map, so a
+# 10k x 10k maze opens without reading or parsing the file.
+
+# The file starts with a fixed header: the magic b"MAZB", the format version, the bits
+# per cell, flags, the width and height, the entrance and exit coordinates (-1 when
+# missing) and the generation seed, unsigned 64-bit. The rows follow, each packed to a
+# whole number of bytes, most significant bits first:
+#   1 bit per cell  - 1 for WALL, 0 for a road (solver states are dropped)
+#   2 bits per cell - the CellType value, so WALKED and DEAD survive
+
+# load_maze() returns a PackedGrid over the mapping. grid[y][x] decodes a single cell in
+# place, so the maze can be read without unpacking it. solve_maze writes WALKED and DEAD
+# marks, so it can run directly only on a 2-bit file loaded with writable=True, and then
+# stores its marks straight into the file. A read-only or 1-bit load has to go through
+# to_grid() first. to_grid() unpacks the whole mapping into a Grid, which is also what
+# the flat-buffer engines of maze_solver need; flatten() does that automatically.
+
+# save_maze_stream() packs the rows of maze_generator.stream_maze as they are produced,
+# so mazes taller than memory go straight to disk.
+
+
+# Import the required libraries
+import mmap
+import struct
+
+from maze_generator import stream_entrance_exit, stream_maze
+from maze_grid import Grid
+
+MAGIC = b"MAZB"
+VERSION = 1
+FLAG_SEED = 1
+
+# magic, version, bits per cell, flags, width, height, entrance x/y, exit x/y, seed
+HEADER = struct.Struct("<4sBBHIIiiiiQ")
+
+# Byte translation tables from cell values to the digits packed into a row
+_WALL_DIGITS = bytes(ord("1") if value == 1 else ord("0") for value in range(256))
+_STATE_DIGITS = bytes(ord("0") + (value & 3) for value in range(256))
+
+# Lookup tables from one packed byte to the cell values it holds
+_UNPACK = {
+    1: [bytes((byte >> shift) & 1 for shift in range(7, -1, -1)) for byte in range(256)],
+    2: [bytes((byte >> shift) & 3 for shift in range(6, -1, -2)) for byte in range(256)],
+}
+
+# Return the number of bytes a packed row of the given width takes
+def row_stride(width, bits):
+    return (width * bits + 7) // 8
+
+# Pack one row of cell values
+def pack_row(row, bits):
+    digits = bytes(row).translate(_WALL_DIGITS if bits == 1 else _STATE_DIGITS)
+    if not digits:
+        return b""
+    stride = row_stride(len(digits), bits)
+    digits += b"0" * ((stride * 8 - len(digits) * bits) // bits)
+    return int(digits, 2 if bits == 1 else 4).to_bytes(stride, "big")
+
+# Unpack one row of cell values
+def unpack_row(data, width, bits):
+    table = _UNPACK[bits]
+    return b"".join([table[byte] for byte in data])[:width]
+
+# Pack the header fields
+def _header(width, height, entrance, exit, seed, bits):
+    entrance = tuple(entrance) or (-1, -1)
+    exit = tuple(exit) or (-1, -1)
+    flags = FLAG_SEED if seed is not None else 0
+    if seed is not None and not 0 <= seed < 1 << 64:
+        raise ValueError("seed %d does not fit the file header, which stores seeds from 0 to 2**64 - 1" % seed)
+    return HEADER.pack(MAGIC, VERSION, bits, flags, width, height,
+                       entrance[0], entrance[1], exit[0], exit[1], seed if seed is not None else 0)
+
+# Save a maze (Grid or list of lists) with its entrance, exit and seed. With states=True
+# two bits per cell are stored so solver marks are kept.
+def save_maze(path, maze, entrance=(), exit=(), seed=None, states=False):
+    bits = 2 if states else 1
+    with open(path, "wb") as file:
+        file.write(_header(len(maze[0]), len(maze), entrance, exit, seed, bits))
+        for row in maze:
+            file.write(pack_row(row, bits))
+
+# Generate a maze with Eller's algorithm straight into a 1-bit file and return its entrance and exit
+def save_maze_stream(path, width, height, seed=None, stats=None):
+    entrance, exit = stream_entrance_exit(width, height)
+    with open(path, "wb") as file:
+        file.write(_header(width, height, entrance, exit, seed, 1))
+        for row in stream_maze(width, height, seed, stats):
+            file.write(pack_row(row, 1))
+    return entrance, exit
+
+# Memory-map a maze file and return (PackedGrid, entrance, exit, seed)
+def load_maze(path, writable=False):
+    with open(path, "r+b" if writable else "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+    magic, version, bits, flags, width, height, ex, ey, xx, xy, seed = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION or bits not in _UNPACK:
+        raise ValueError("%s is not a maze file this version can read" % path)
+    if len(buffer) < HEADER.size + row_stride(width, bits) * height:
+        raise ValueError("%s is truncated" % path)
+    entrance = [ex, ey] if ex >= 0 else []
+    exit = [xx, xy] if xx >= 0 else []
+    return PackedGrid(buffer, width, height, bits, HEADER.size), entrance, exit, seed if flags & FLAG_SEED else None
+
+# Define a class for one row of a packed grid
+class PackedRow:
+
+    def __init__(self, grid, y):
+        self.grid = grid
+        self.offset = grid.offset + y * grid.stride
+
+    def __len__(self):
+        return self.grid.width
+
+    def __getitem__(self, x):
+        grid = self.grid
+        if not 0 <= x < grid.width:
+            raise IndexError("cell index out of range")
+        bit = x * grid.bits
+        shift = 8 - grid.bits - (bit & 7)
+        return (grid.buffer[self.offset + (bit >> 3)] >> shift) & grid.mask
+
+    def __setitem__(self, x, value):
+        grid = self.grid
+        if not 0 <= x < grid.width:
+            raise IndexError("cell index out of range")
+        if value > grid.mask:
+            raise ValueError("a %d-bit maze file cannot store cell value %d" % (grid.bits, value))
+        bit = x * grid.bits
+        shift = 8 - grid.bits - (bit & 7)
+        pos = self.offset + (bit >> 3)
+        grid.buffer[pos] = (grid.buffer[pos] & ~(grid.mask << shift) & 0xFF) | (value << shift)
+
+    def __iter__(self):
+        return iter(unpack_row(self.grid.row_bytes(self.offset), self.grid.width, self.grid.bits))
+
+# Define a class for a bit-packed grid read in place from a buffer
+class PackedGrid:
+
+    def __init__(self, buffer, width, height, bits, offset=0):
+        self.buffer = buffer
+        self.width = width
+        self.height = height
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+        self.offset = offset
+        self.stride = row_stride(width, bits)
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, y):
+        if y < 0:
+            y += self.height
+        if not 0 <= y < self.height:
+            raise IndexError("row index out of range")
+        return PackedRow(self, y)
+
+    def __iter__(self):
+        return (PackedRow(self, y) for y in range(self.height))
+
+    # Return the packed bytes of the row starting at the given offset
+    def row_bytes(self, offset):
+        return self.buffer[offset:offset + self.stride]
+
+    # Unpack the whole grid into a Grid
+    def to_grid(self):
+        stride, bits, width = self.stride, self.bits, self.width
+        buffer = bytearray()
+        for offset in range(self.offset, self.offset + stride * self.height, stride):
+            buffer += unpack_row(self.buffer[offset:offset + stride], width, bits)
+        return Grid(width, self.height, buffer=buffer)
+
+    # Flush pending writes of a writable mapping to disk
+    def flush(self):
+        self.buffer.flush()
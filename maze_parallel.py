@@ -0,0 +1,192 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# maze_parallel.py
+
+# solves one very large maze on several cores with a level-synchronous breadth-first
+# search, the grid shared between the processes instead of copied to each of them.
+
+# parallel_solve() copies the maze cells once into a multiprocessing.shared_memory block
+# and splits the rows into one horizontal band per worker process. Workers attach to the
+# block by name, so the grid is never pickled. The only cell writes are BFS labels, and
+# each worker writes only inside its own band. A label is the distance from the start
+# modulo 3, plus one, kept in bits 2-3 of the cell byte next to its CellType.
+
+# The search runs in rounds, one BFS level per round. The parent sends each worker the
+# cells of the new level that its neighbors found inside its band. The worker labels
+# them, expands its whole local frontier by one level, and sends back the cells it
+# reached across its top and bottom edges. Only those boundary cells travel between
+# processes, and workers with nothing to do sit the round out. The search stops once
+# the goal is labeled, or when no band has a frontier left.
+
+# The path is read back from the labels. From the goal, the walk moves to a neighbor
+# (trying up, right, down, left) whose label is one level lower. Neighboring cells are
+# never more than one level apart, so the labels mod 3 are enough. This is the same
+# back-trace the bitboard engine of maze_solver uses, so both return the same path, and
+# every engine returns the same path on a perfect maze.
+
+# Usage:
+#   python maze_parallel.py --size 4001 --workers 4
+
+
+# Import the required libraries
+import argparse
+import bisect
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+from maze_grid import WALLS_ONLY, neighbor_indices
+from maze_solver import CellType, flatten
+
+# Define a function for one band worker process
+def _band_worker(conn, name, width, height, y0, y1):
+    shm = shared_memory.SharedMemory(name=name)
+    cells = shm.buf
+    try:
+        lo, hi, total = y0 * width, y1 * width, width * height
+        frontier = []
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            level, incoming = message
+            # Cells of this level found by the neighbor bands: label the ones still unseen
+            mark = (level % 3 + 1) << 2
+            for idx in incoming:
+                value = cells[idx]
+                if value < 4 and value != CellType.WALL:
+                    cells[idx] = value | mark
+                    frontier.append(idx)
+            # Expand the frontier by one level; cells across the band edges go to the neighbors
+            mark = ((level + 1) % 3 + 1) << 2
+            up, down, next_frontier = [], [], []
+            for idx in frontier:
+                for n in neighbor_indices(idx, width, total):
+                    if n < lo:
+                        up.append(n)
+                    elif n >= hi:
+                        down.append(n)
+                    else:
+                        value = cells[n]
+                        if value < 4 and value != CellType.WALL:
+                            cells[n] = value | mark
+                            next_frontier.append(n)
+            frontier = next_frontier
+            conn.send((up, down, len(frontier)))
+    finally:
+        del cells
+        shm.close()
+        conn.close()
+
+# Return the first row of each band when splitting height rows into count bands
+def band_starts(height, count):
+    count = max(1, min(count, height))
+    return [height * i // count for i in range(count)]
+
+# Walk the labels back from goal to start and return the path as flat indices
+def _trace_labels(cells, width, height, start, goal):
+    total = width * height
+    idx = goal
+    path = [goal]
+    while idx != start:
+        wanted = ((cells[idx] >> 2) + 1) % 3 + 1
+        for n in neighbor_indices(idx, width, total):
+            if cells[n] >> 2 == wanted:
+                idx = n
+                break
+        path.append(idx)
+    path.reverse()
+    return path
+
+# Find the shortest path from start to end with workers processes (default: one per CPU)
+# sharing the grid. Return it as a list of (x, y) cells, empty if end cannot be reached.
+def parallel_solve(maze, start, end, workers=None):
+    cells, width, height = flatten(maze)
+    for x, y in (start, end):
+        if not (0 <= x < width and 0 <= y < height) or cells[y * width + x] == CellType.WALL:
+            raise ValueError("position (%s, %s) is not an open cell of the maze" % (x, y))
+    start_idx, goal_idx = start[1] * width + start[0], end[1] * width + end[0]
+    if start_idx == goal_idx:
+        return [tuple(start)]
+    total = width * height
+    starts = band_starts(height, workers or os.cpu_count() or 1)
+    ends = starts[1:] + [height]
+
+    shm = shared_memory.SharedMemory(create=True, size=total)
+    processes, conns = [], []
+    try:
+        shared = shm.buf
+        shared[:total] = cells
+        # Only the cell types are kept; solver marks would read as labels
+        for i in range(0, total, 1 << 20):
+            shared[i:i + (1 << 20)] = bytes(shared[i:i + (1 << 20)]).translate(WALLS_ONLY)
+        for y0, y1 in zip(starts, ends):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_band_worker, args=(child, shm.name, width, height, y0, y1), daemon=True)
+            process.start()
+            child.close()
+            processes.append(process)
+            conns.append(parent)
+
+        # Round by round, hand each band the cells of the level its neighbors found in it
+        incoming = {bisect.bisect_right(starts, start[1]) - 1: [start_idx]}
+        busy = set()
+        level = 0
+        found = False
+        while incoming or busy:
+            active = sorted(busy | set(incoming))
+            for band in active:
+                conns[band].send((level, incoming.get(band, ())))
+            incoming, busy = {}, set()
+            for band in active:
+                up, down, size = conns[band].recv()
+                if up:
+                    incoming.setdefault(band - 1, []).extend(up)
+                if down:
+                    incoming.setdefault(band + 1, []).extend(down)
+                if size:
+                    busy.add(band)
+            if shared[goal_idx] >= 4:
+                found = True
+                break
+            level += 1
+        path = _trace_labels(shared, width, height, start_idx, goal_idx) if found else []
+        del shared
+        return [(idx % width, idx // width) for idx in path]
+    finally:
+        for conn in conns:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            conn.close()
+        for process in processes:
+            process.join()
+        shm.close()
+        shm.unlink()
+
+if __name__ == "__main__":
+    from maze_generator import open_maze_stream, stream_entrance_exit, write_maze_stream
+    from maze_solver import solve
+
+    parser = argparse.ArgumentParser(description="Time the parallel solver against the serial one.")
+    parser.add_argument("--size", type=int, default=2001)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--file", default="parallel_maze.bin", help="where the streamed maze is kept")
+    args = parser.parse_args()
+    with open(args.file, "wb") as out:
+        write_maze_stream(out, args.size, args.size, args.seed)
+    grid = open_maze_stream(args.file, args.size, args.size)
+    entrance, exit = stream_entrance_exit(args.size, args.size)
+    started = time.perf_counter()
+    serial = solve(grid, entrance, exit, "bfs").path
+    print("serial bfs: %d cells in %.2f s" % (len(serial), time.perf_counter() - started))
+    # The parallel back-trace follows the bitboard engine's, so that is the path to match
+    serial = solve(grid, entrance, exit, "bitboard").path
+    for count in args.workers:
+        started = time.perf_counter()
+        path = parallel_solve(grid, entrance, exit, count)
+        print("%d workers: %d cells in %.2f s%s" % (count, len(path), time.perf_counter() - started,
+                                                   "" if path == serial else " (path differs)"))
@@ -0,0 +1,112 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# maze_prefetch.py
+
+# keeps a few levels ready in the background, so that switching to the next level
+# does not generate anything on the UI thread.
+
+# A LevelPrefetcher runs one daemon thread that fills a bounded queue with Level tuples:
+# the generated maze with its entrance and exit, the seed it came from, its solution
+# indexes (the junction graph, cached on the Grid, and the distance field to the exit)
+# and the trace of the walker solving it (maze_trace.py), ready to be played back.
+# The thread blocks while the queue is full and refills it as levels are taken.
+
+# Sizes and seeds come from one random.Random seeded when the prefetcher is made, so a
+# given prefetcher seed always serves the same sequence of levels. Only the thread that
+# builds levels draws from it: get() takes a ready level in constant time, and if the
+# pool has run dry it waits for the level the thread is building. Without a running
+# thread, get() builds the next level itself. A level still being built when the thread
+# is stopped is dropped, and its size and seed are kept to be built first next time.
+
+
+# Import the required libraries
+import queue
+import random
+import threading
+from collections import namedtuple
+
+from maze_cache import DistanceField
+from maze_generator import generate_maze
+from maze_graph import graph_index
+from maze_trace import record_solve
+
+# One ready-to-play level
+Level = namedtuple("Level", ["maze", "entrance", "exit", "seed", "size", "field", "trace"])
+
+# Define a class for the level prefetcher
+class LevelPrefetcher:
+
+    # size_fn(rng) picks the size of the next level; capacity is the number of levels kept ready
+    def __init__(self, size_fn, capacity=3, seed=None, algorithm="prim"):
+        self.size_fn = size_fn
+        self.algorithm = algorithm
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        # Drawn specs whose levels were dropped by stop(), served before new draws
+        self.pending = []
+        self.levels = queue.Queue(capacity)
+        self.stopped = threading.Event()
+        self.thread = None
+
+    # Draw the size and seed of the next level
+    def _next_spec(self):
+        with self.rng_lock:
+            if self.pending:
+                return self.pending.pop()
+            return self.size_fn(self.rng), self.rng.getrandbits(64)
+
+    # Give back a drawn spec whose level was not served
+    def _return_spec(self, spec):
+        with self.rng_lock:
+            self.pending.append(spec)
+
+    # Generate a level, build its solution indexes and record the walker's solve
+    def build(self, size, seed):
+        maze, entrance, exit = generate_maze(size, size, algorithm=self.algorithm, seed=seed)
+        graph_index(maze)
+        field = DistanceField(maze, exit) if exit else None
+        trace = record_solve(maze, entrance, exit) if exit else None
+        return Level(maze, entrance, exit, seed, size, field, trace)
+
+    # Keep the pool full until stopped
+    def _fill(self):
+        while not self.stopped.is_set():
+            spec = self._next_spec()
+            level = self.build(*spec)
+            while True:
+                if self.stopped.is_set():
+                    self._return_spec(spec)
+                    return
+                try:
+                    self.levels.put(level, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    # Start the background thread
+    def start(self):
+        if self.thread is None:
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self._fill, daemon=True)
+            self.thread.start()
+        return self
+
+    # Stop the background thread
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    # Return the next level: a prefetched one if ready, otherwise the one the thread is
+    # building, or one built now when the thread is not running
+    def get(self):
+        while self.thread is not None and self.thread.is_alive():
+            try:
+                return self.levels.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        try:
+            return self.levels.get_nowait()
+        except queue.Empty:
+            return self.build(*self._next_spec())
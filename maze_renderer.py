@@ -0,0 +1,237 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# maze_renderer.py
+
+# draws a maze through a camera with pygame, so that a maze of any size fits the window
+# and one solver step costs a couple of rectangles rather than a full redraw.
+
+# The camera shows a square window onto the maze. Its top-left cell is (cam_x, cam_y), and
+# its zoom is a pair of whole numbers: cell_size screen pixels per cell when zoomed in, or
+# stride cells per screen pixel when zoomed out. A new maze starts fitted to the area:
+# small mazes get big cells, and mazes wider than the area in pixels are shown as an
+# overview.
+
+# The view is built in bulk, never cell by cell. The cell bytes of the visible rows
+# (every stride-th row and cell when zoomed out) are joined into one 8-bit image whose
+# palette maps each CellType to its color. That image is scaled up by cell_size and
+# blitted in one go. Building a view costs as much as the pixels it covers, whatever the
+# size of the maze, so frame time stays flat from small mazes up to 10001x10001. In the
+# overview, a pixel stands for a stride x stride block and shows the block's sampled
+# cell, or the latest solver state painted anywhere in that block.
+
+# After that, draw() only repaints the dirty cells that are in view: the cell the cursor
+# just left, the cell it moved onto and any cells the caller names. Only those
+# rectangles are sent to pygame.display.update(). When the cursor walks out of view, the
+# camera re-centers on it.
+
+# pan(), zoom(), center_on() and fit() move the camera and rebuild the view.
+
+
+# Import the required libraries
+import pygame
+
+from maze_solver import CellType, flatten
+
+# Define the colors used for each cell state
+COLOR_WHITE = (255, 255, 255)
+COLOR_BLACK = (0, 0, 0)
+COLOR_RED = (255, 0, 0)
+COLOR_GREEN = (0, 255, 0)
+COLOR_CYAN = (0, 255, 255)
+
+CELL_COLORS = {
+    CellType.ROAD: COLOR_WHITE,
+    CellType.WALL: COLOR_BLACK,
+    CellType.WALKED: COLOR_CYAN,
+    CellType.DEAD: COLOR_RED,
+}
+CURSOR_COLOR = COLOR_GREEN
+
+# 8-bit palette indexed by cell state, so views are built straight from the cell bytes
+PALETTE = [CELL_COLORS.get(value, COLOR_WHITE) for value in range(256)]
+
+# Largest cell size in pixels when zooming in
+MAX_CELL_SIZE = 32
+
+# Return an 8-bit Surface with one pixel per sampled cell of columns x0..x1 and rows
+# y0..y1, taking every stride-th cell and row
+def cell_surface(cells, width, x0, y0, x1, y1, stride=1):
+    rows = [cells[y * width + x0:y * width + x1:stride] for y in range(y0, y1, stride)]
+    surface = pygame.image.fromstring(b"".join(rows), (len(rows[0]), len(rows)), "P")
+    surface.set_palette(PALETTE)
+    return surface
+
+# Define a class for the camera-based renderer
+class MazeRenderer:
+
+    # Initialize the renderer for the given screen and square maze area (x, y, size)
+    def __init__(self, screen, x, y, size):
+        self.screen = screen
+        self.x = x
+        self.y = y
+        self.size = size
+        self.maze = None
+        self.cursor = None
+        self.width = self.height = 0
+        # Camera: top-left cell and zoom
+        self.cam_x = self.cam_y = 0
+        self.cell_size = 1
+        self.stride = 1
+        self.pad_x = self.pad_y = 0
+
+    # Forget the current maze so the next draw() repaints everything
+    def invalidate(self):
+        self.maze = None
+
+    # Take a new maze and fit the camera to it
+    def _prepare(self, maze):
+        _, self.width, self.height = flatten(maze)
+        self.maze = maze
+        self.cursor = None
+        self.fit(False)
+
+    # Number of cells the area covers along each axis
+    @property
+    def span(self):
+        return self.size * self.stride // self.cell_size
+
+    # Zoom so that the whole maze fits the area and move the camera to its corner
+    def fit(self, refresh=True):
+        longest = max(self.width, self.height, 1)
+        if longest <= self.size:
+            self.cell_size, self.stride = min(MAX_CELL_SIZE, self.size // longest), 1
+        else:
+            # An odd stride samples both wall and cell columns, so the overview keeps the maze texture
+            self.cell_size, self.stride = 1, -(-longest // self.size) | 1
+        self.cam_x = self.cam_y = 0
+        if refresh:
+            self.refresh()
+
+    # Keep the camera inside the maze and on the stride grid, so panning does not shimmer
+    def _clamp(self):
+        span = self.span
+        self.cam_x = max(0, min(self.cam_x, self.width - span))
+        self.cam_y = max(0, min(self.cam_y, self.height - span))
+        self.cam_x -= self.cam_x % self.stride
+        self.cam_y -= self.cam_y % self.stride
+
+    # Move the camera by (dx, dy) cells
+    def pan(self, dx, dy):
+        self.cam_x += dx
+        self.cam_y += dy
+        self.refresh()
+
+    # Move the camera so that cell (x, y) is in the middle of the area
+    def center_on(self, x, y, refresh=True):
+        half = self.span // 2
+        self.cam_x, self.cam_y = x - half, y - half
+        if refresh:
+            self.refresh()
+
+    # Zoom in (steps > 0) or out (steps < 0), keeping the cell under screen point focus in place
+    def zoom(self, steps, focus=None):
+        if self.maze is None:
+            return
+        if focus is None:
+            focus = (self.x + self.size // 2, self.y + self.size // 2)
+        cell = self.screen_to_cell(*focus)
+        for _ in range(abs(steps)):
+            if steps > 0:
+                if self.stride > 1:
+                    self.stride = (self.stride // 2) | 1 if self.stride > 3 else 1
+                else:
+                    self.cell_size = min(MAX_CELL_SIZE, self.cell_size * 2)
+            elif self.span < max(self.width, self.height):
+                if self.cell_size > 1:
+                    self.cell_size //= 2
+                else:
+                    self.stride = self.stride * 2 + 1
+        if cell is not None:
+            # Put the focus cell back under the focus point
+            self.cam_x = cell[0] - (focus[0] - self.x) * self.stride // self.cell_size
+            self.cam_y = cell[1] - (focus[1] - self.y) * self.stride // self.cell_size
+        self.refresh()
+
+    # Return the maze cell under screen point (px, py), or None outside the maze
+    def screen_to_cell(self, px, py):
+        x = self.cam_x + (px - self.x - self.pad_x) // self.cell_size * self.stride
+        y = self.cam_y + (py - self.y - self.pad_y) // self.cell_size * self.stride
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return x, y
+        return None
+
+    # Check whether cell (x, y) is inside the camera view
+    def visible(self, x, y):
+        span = self.span
+        return self.cam_x <= x < self.cam_x + span and self.cam_y <= y < self.cam_y + span
+
+    # Return the screen rectangle of cell (x, y); when zoomed out, the pixel of its block
+    def cell_rect(self, x, y):
+        side = self.cell_size
+        return pygame.Rect(self.x + self.pad_x + (x - self.cam_x) // self.stride * side,
+                           self.y + self.pad_y + (y - self.cam_y) // self.stride * side, side, side)
+
+    # Paint one cell in its current state (or the cursor color) and return its rectangle,
+    # or None when it is out of view
+    def _paint(self, maze, x, y, is_cursor=False):
+        if not self.visible(x, y):
+            return None
+        color = CURSOR_COLOR if is_cursor else CELL_COLORS.get(maze[y][x], COLOR_WHITE)
+        return pygame.draw.rect(self.screen, color, self.cell_rect(x, y), 0)
+
+    # Build the view of the camera in bulk and blit it over the maze area
+    def _blit_view(self):
+        self._clamp()
+        cells, width, height = flatten(self.maze)
+        span = self.span
+        x0, y0 = self.cam_x, self.cam_y
+        x1, y1 = min(width, x0 + span), min(height, y0 + span)
+        view = cell_surface(cells, width, x0, y0, x1, y1, self.stride)
+        if self.cell_size > 1:
+            view = pygame.transform.scale(view, (view.get_width() * self.cell_size, view.get_height() * self.cell_size))
+        # Center the maze along an axis it does not fill
+        self.pad_x = (self.size - view.get_width()) // 2 if x0 == 0 and x1 == width else 0
+        self.pad_y = (self.size - view.get_height()) // 2 if y0 == 0 and y1 == height else 0
+        area = pygame.Rect(self.x, self.y, self.size, self.size)
+        self.screen.fill(COLOR_WHITE, area)
+        self.screen.blit(view, (self.x + self.pad_x, self.y + self.pad_y))
+        return area
+
+    # Repaint the maze area for the current camera
+    def refresh(self):
+        if self.maze is None:
+            return
+        area = self._blit_view()
+        if self.cursor is not None:
+            self._paint(self.maze, self.cursor[0], self.cursor[1], True)
+        pygame.display.update(area)
+
+    # Repaint the whole maze area, fitting the camera first if the maze is new
+    def redraw(self, maze, cur_pos=None):
+        if maze is not self.maze:
+            self._prepare(maze)
+        self.cursor = (cur_pos[1], cur_pos[2]) if cur_pos else None
+        self.refresh()
+
+    # Draw one solver step: cur_pos is the (value, x, y) tuple passed to the solver callback.
+    # dirty may list extra (x, y) cells whose state changed since the last frame.
+    def draw(self, maze, cur_pos, dirty=()):
+        if maze is not self.maze:
+            self.redraw(maze, cur_pos)
+            return
+        # Follow the cursor when it walks out of view
+        if cur_pos and not self.visible(cur_pos[1], cur_pos[2]):
+            self.cursor = (cur_pos[1], cur_pos[2])
+            self.center_on(cur_pos[1], cur_pos[2])
+            return
+        rects = []
+        # The cell the cursor leaves has just been marked by the solver
+        if self.cursor is not None:
+            rects.append(self._paint(maze, self.cursor[0], self.cursor[1]))
+        for x, y in dirty:
+            rects.append(self._paint(maze, x, y))
+        self.cursor = None
+        if cur_pos:
+            self.cursor = (cur_pos[1], cur_pos[2])
+            rects.append(self._paint(maze, self.cursor[0], self.cursor[1], True))
+        pygame.display.update([rect for rect in rects if rect is not None])
@@ -0,0 +1,252 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# maze_server.py
+
+# serves maze generation, solving and hints to local game clients over TCP, so that the
+# clients no longer have to do that work themselves.
+
+# The protocol is one JSON object per line in each direction. A request names an op and
+# a maze. A maze is (size, seed, algorithm): generation is deterministic, so the server
+# and the client both know the same maze from its seed and only the answers cross the
+# wire. Every response echoes the request id.
+#   {"id": 1, "op": "generate", "size": 41, "seed": 7}
+#       -> {"id": 1, "width": 41, "height": 41, "entrance": [0, 1], "exit": [40, 39],
+#           "walls": <base64 of Grid.pack_walls()>}
+#   {"id": 2, "op": "solve", "size": 41, "seed": 7, "solver": "astar"}
+#       -> {"id": 2, "path_length": 151, "moves": <base64 of maze_batch.encode_path()>}
+#   {"id": 3, "op": "hint", "size": 41, "seed": 7, "pos": [5, 9]}
+#       -> {"id": 3, "next": [5, 10], "distance": 120}
+#   {"id": 4, "op": "stats"} -> the server counters
+# A failed request gets {"id": ..., "error": "..."}; "busy" means the pool was saturated.
+
+# The asyncio event loop only parses, routes and answers. The CPU-bound work runs in a
+# process pool. Each worker keeps its most recent mazes, and in a smaller LRU the distance
+# fields of the mazes it has been asked hints on, so repeated hints on one maze skip
+# generation and search, while generate and solve requests never pay for a field. On top of that the server:
+#   - coalesces identical requests: a request equal to one still running waits for that
+#     result instead of submitting the work again
+#   - caches the results of recent requests in an LRU, so hot seeds are answered without
+#     touching the pool
+#   - applies backpressure: at most max_pending jobs are in the pool at once, a request
+#     that cannot get a slot within busy_timeout is answered "busy", and each connection
+#     is served one request at a time, so a client sending faster than it is served is
+#     slowed down by TCP itself
+
+# Usage:
+#   python maze_server.py --port 8765 --workers 4
+# and see maze_client.py for the client and the load test.
+
+
+# Import the required libraries
+import argparse
+import asyncio
+import base64
+import functools
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from maze_batch import encode_path
+from maze_cache import DistanceField
+from maze_generator import GENERATORS, generate_maze
+from maze_solver import ALGORITHMS, solve
+
+DEFAULT_PORT = 8765
+
+# Largest maze side the server accepts
+MAX_SIZE = 4001
+
+# Mazes each worker process keeps, and distance fields for hints (a field takes 8 bytes per cell)
+WORKER_LEVELS = 8
+WORKER_FIELDS = 2
+
+# ____________________________________WORKERS____________________________________
+# These run in the pool processes and return plain JSON-ready dictionaries.
+
+# Generate a level, keeping the most recent ones per process
+@functools.lru_cache(maxsize=WORKER_LEVELS)
+def _level(width, height, algorithm, seed):
+    return generate_maze(width, height, algorithm=algorithm, seed=seed)
+
+# Return the distance field to the exit of a level (None without an exit), built on its first hint
+@functools.lru_cache(maxsize=WORKER_FIELDS)
+def _field(width, height, algorithm, seed):
+    maze, entrance, exit = _level(width, height, algorithm, seed)
+    return DistanceField(maze, exit) if exit else None
+
+def _generate(width, height, algorithm, seed):
+    maze, entrance, exit = _level(width, height, algorithm, seed)
+    return {
+        "width": width, "height": height, "entrance": entrance, "exit": exit,
+        "walls": base64.b64encode(maze.pack_walls()).decode("ascii"),
+    }
+
+def _solve(width, height, algorithm, seed, solver):
+    maze, entrance, exit = _level(width, height, algorithm, seed)
+    path = solve(maze, entrance, exit, solver).path if exit else []
+    return {"path_length": len(path), "moves": base64.b64encode(encode_path(path)).decode("ascii")}
+
+def _hint(width, height, algorithm, seed, x, y):
+    field = _field(width, height, algorithm, seed)
+    if field is None:
+        return {"next": None, "distance": -1}
+    if not (0 <= x < width and 0 <= y < height):
+        raise ValueError("position (%s, %s) is outside the maze" % (x, y))
+    next_step = field.next_step(x, y)
+    return {"next": list(next_step) if next_step else None, "distance": field.distance(x, y)}
+
+# _____________________________________SERVER_____________________________________
+
+# Return value if it is a non-negative int (up to limit), or raise ValueError
+def _check_int(name, value, limit=None):
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0 or (limit is not None and value > limit):
+        raise ValueError("%s must be a non-negative integer%s" % (name, "" if limit is None else " up to %d" % limit))
+    return value
+
+# Return value if it is one of the names in choices, or raise ValueError. The type is
+# checked first, since a JSON list or object cannot even be looked up in a dict.
+def _check_name(name, value, choices):
+    if not isinstance(value, str) or value not in choices:
+        raise ValueError("unknown %s %r" % (name, value))
+    return value
+
+# Turn a request into (cache key, worker function, arguments); the key identifies identical requests
+def parse_request(request):
+    op = _check_name("op", request.get("op"), ("generate", "solve", "hint"))
+    size = request.get("size")
+    width, height = size if isinstance(size, list) and len(size) == 2 else (size, size)
+    width, height = _check_int("width", width, MAX_SIZE), _check_int("height", height, MAX_SIZE)
+    if width < 3 or height < 3:
+        raise ValueError("size must be at least 3")
+    seed = _check_int("seed", request.get("seed"))
+    algorithm = _check_name("algorithm", request.get("algorithm", "prim"), GENERATORS)
+    args = (width, height, algorithm, seed)
+    if op == "generate":
+        return (op,) + args, _generate, args
+    if op == "solve":
+        solver = _check_name("solver", request.get("solver", "bfs"), ALGORITHMS)
+        return (op,) + args + (solver,), _solve, args + (solver,)
+    pos = request.get("pos")
+    if not isinstance(pos, list) or len(pos) != 2:
+        raise ValueError("pos must be [x, y]")
+    x, y = _check_int("x", pos[0]), _check_int("y", pos[1])
+    return (op,) + args + (x, y), _hint, args + (x, y)
+
+# Define a class for the maze service
+class MazeService:
+
+    # workers defaults to the number of CPUs, max_pending to four jobs per worker
+    def __init__(self, workers=None, max_pending=None, cache_size=1024, busy_timeout=1.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.workers
+        self.cache_size = cache_size
+        self.busy_timeout = busy_timeout
+        self.pool = None
+        self.slots = None
+        self.inflight = {}
+        self.results = OrderedDict()
+        self.counters = {"requests": 0, "computed": 0, "cache_hits": 0, "coalesced": 0, "busy": 0, "errors": 0}
+
+    # Start the process pool; must be called from the event loop
+    def start(self):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.workers)
+            self.slots = asyncio.Semaphore(self.max_pending)
+        return self
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    # Run one job in the pool once a slot is free, or raise asyncio.TimeoutError
+    async def _compute(self, key, fn, args):
+        await asyncio.wait_for(self.slots.acquire(), self.busy_timeout)
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+        finally:
+            self.slots.release()
+        self.counters["computed"] += 1
+        self.results[key] = result
+        if len(self.results) > self.cache_size:
+            self.results.popitem(last=False)
+        return result
+
+    # Answer one decoded request with a response dictionary
+    async def handle(self, request):
+        self.counters["requests"] += 1
+        response = {"id": request.get("id")} if isinstance(request, dict) else {"id": None}
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            if request.get("op") == "stats":
+                response.update(self.counters, pending=len(self.inflight), cached=len(self.results))
+                return response
+            key, fn, args = parse_request(request)
+            result = self.results.get(key)
+            if result is not None:
+                self.counters["cache_hits"] += 1
+                self.results.move_to_end(key)
+            else:
+                task = self.inflight.get(key)
+                if task is not None:
+                    self.counters["coalesced"] += 1
+                else:
+                    task = asyncio.ensure_future(self._compute(key, fn, args))
+                    self.inflight[key] = task
+                    task.add_done_callback(lambda _: self.inflight.pop(key, None))
+                # Shielded so one waiter disconnecting does not cancel the others
+                result = await asyncio.shield(task)
+            response.update(result)
+        except asyncio.TimeoutError:
+            self.counters["busy"] += 1
+            response["error"] = "busy"
+        except ValueError as error:
+            self.counters["errors"] += 1
+            response["error"] = str(error)
+        return response
+
+    # Serve one connection, one request line at a time
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    request = None
+                response = await self.handle(request)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    # Listen on host:port until cancelled
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self.start()
+        server = await asyncio.start_server(self.serve_connection, host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve maze generation, solving and hints over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--max-pending", type=int, default=None, help="jobs in the pool at once (default: 4 per worker)")
+    parser.add_argument("--cache-size", type=int, default=1024, help="results kept for hot seeds")
+    args = parser.parse_args()
+    service = MazeService(args.workers, args.max_pending, args.cache_size)
+    print("Serving mazes on %s:%d with %d workers" % (args.host, args.port, service.workers))
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,91 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# maze_stats.py
+
+# collects counters, timings and optional per-step traces from the solvers of maze_solver
+# and maze_graph and from the generators of maze_generator.
+
+# Every solver and generator takes an optional stats argument. It defaults to None, and
+# then nothing is recorded. Hot loops only pay for a None check, and most numbers
+# (expanded cells, path length, elapsed time) are reported once, at the end of a run.
+# Pass a Stats object to collect:
+#   counters - totals such as expanded, backtracks, carved (count), or the largest
+#              value seen, such as peak_frontier (peak)
+#   timers   - seconds spent in named phases, accumulated across runs
+#   trace    - one row per step, only when Stats(trace=True), e.g. the walker's moves
+
+# One Stats object can collect many runs; to_json() and to_csv() export what it holds.
+
+
+# Import the required libraries
+import csv
+import json
+import time
+from contextlib import contextmanager
+
+# Define a class for collected statistics
+class Stats:
+
+    def __init__(self, name="", trace=False):
+        self.name = name
+        self.trace = trace
+        self.counters = {}
+        self.timers = {}
+        self.rows = []
+
+    # Add n to a counter
+    def count(self, key, n=1):
+        self.counters[key] = self.counters.get(key, 0) + n
+
+    # Keep the largest value seen for a counter
+    def peak(self, key, value):
+        if value > self.counters.get(key, value - 1):
+            self.counters[key] = value
+
+    # Add seconds to a timer
+    def add_time(self, key, seconds):
+        self.timers[key] = self.timers.get(key, 0.0) + seconds
+
+    # Time the body of a with-block into a timer
+    @contextmanager
+    def timer(self, key):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(key, time.perf_counter() - started)
+
+    # Record one trace row (ignored unless tracing)
+    def event(self, **fields):
+        if self.trace:
+            self.rows.append(fields)
+
+    # Return everything collected as a dictionary
+    def to_dict(self):
+        return {"name": self.name, "counters": dict(self.counters), "timers": dict(self.timers), "trace": list(self.rows)}
+
+    # Return the statistics as JSON, also writing them to path if given
+    def to_json(self, path=None):
+        text = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, "w") as file:
+                file.write(text)
+        return text
+
+    # Write the trace rows to a CSV file, or the counters and timers when there is no trace
+    def to_csv(self, path):
+        with open(path, "w", newline="") as file:
+            if self.rows:
+                fields = []
+                for row in self.rows:
+                    fields.extend(key for key in row if key not in fields)
+                writer = csv.DictWriter(file, fieldnames=fields)
+                writer.writeheader()
+                writer.writerows(self.rows)
+            else:
+                writer = csv.writer(file)
+                writer.writerow(["kind", "key", "value"])
+                for key, value in sorted(self.counters.items()):
+                    writer.writerow(["counter", key, value])
+                for key, value in sorted(self.timers.items()):
+                    writer.writerow(["timer", key, value])
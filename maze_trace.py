@@ -0,0 +1,222 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# maze_trace.py
+
+# records solver runs as compact traces and plays them back, so solving runs at full
+# speed once and the display can show the run at any pace afterwards, or never.
+
+# A Trace holds the maze as it was before the solve, plus one event per cell the solver
+# marked: the cell index and its new CellType. Events are delta-encoded against the
+# previous cell and varint-packed. A step to one of the four neighbors (almost every
+# walker step) becomes a 2-bit direction code next to the 2-bit state, so it fits in
+# one byte. Any other jump stores the zigzagged index delta after an escape code.
+
+# Every interval steps the trace keeps a keyframe: the full cell states at that step,
+# packed two bits per cell, with the byte offset of the next event. Seeking restores
+# the nearest keyframe at or before the target and applies at most interval events, so
+# a seek costs the same however long the trace is. The interval grows with the maze so
+# that keyframes take about as much room as the events. save() writes only the start
+# state and the events, for archiving; load() rebuilds the keyframes.
+
+# record_solve() runs solve_maze on a copy of the maze with a recording callback and no
+# rendering. A TracePlayer replays a trace onto a Grid: seek() jumps to any step, and
+# advance() moves forward and returns the changed cells for an incremental redraw.
+
+
+# Import the required libraries
+import struct
+import time
+
+from maze_grid import Grid
+from maze_io import pack_row, unpack_row
+from maze_solver import CellType, flatten, solve_maze
+
+MAGIC = b"MAZT"
+VERSION = 1
+
+# magic, version, solved, width, height, entrance x/y, step count, solve time, event bytes
+HEADER = struct.Struct("<4sBBIIiiQdQ")
+
+# Smallest number of steps between two keyframes
+MIN_INTERVAL = 256
+
+# Append value to out as a little-endian base-128 varint
+def _put_varint(out, value):
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+# Decode count events (all when None) from events[offset:], starting after cell last.
+# Return the list of (idx, state) and the offset of the next event.
+def _decode(events, moves, offset, last, count):
+    out = []
+    end = len(events)
+    while offset < end and count != 0:
+        value = events[offset]
+        offset += 1
+        if value & 0x80:
+            value &= 0x7F
+            shift = 7
+            while True:
+                byte = events[offset]
+                offset += 1
+                value |= (byte & 0x7F) << shift
+                if not byte & 0x80:
+                    break
+                shift += 7
+        code = value >> 2
+        if code < 4:
+            last += moves[code]
+        else:
+            code -= 4
+            last += -((code + 1) >> 1) if code & 1 else code >> 1
+        out.append((last, value & 3))
+        if count is not None:
+            count -= 1
+    return out, offset
+
+# Define a class for a recorded solver run
+class Trace:
+
+    # Start a trace of a width x height maze from its cells before the solve
+    def __init__(self, width, height, cells, entrance, interval=None):
+        self.width = width
+        self.height = height
+        self.initial = bytes(cells)
+        self.entrance = tuple(entrance)
+        self.interval = interval or max(MIN_INTERVAL, width * height // 4)
+        self.events = bytearray()
+        self.steps = 0
+        self.solved = False
+        self.solve_time = 0.0
+        # Neighbor offsets in the order of the direction codes: up, right, down, left
+        self.moves = (-width, 1, width, -1)
+        self.last = self.entrance[1] * width + self.entrance[0]
+        # Current cell states, kept only to take keyframes while recording
+        self.state = bytearray(self.initial)
+        # (step, event offset, index of the last cell, packed cell states)
+        self.keyframes = [(0, 0, self.last, pack_row(self.state, 2))]
+
+    # Append one event: cell idx now holds state
+    def record(self, idx, state):
+        delta = idx - self.last
+        if delta in self.moves:
+            code = self.moves.index(delta)
+        else:
+            code = 4 + (delta << 1 if delta >= 0 else (-delta << 1) - 1)
+        _put_varint(self.events, code << 2 | state & 3)
+        self.last = idx
+        self.state[idx] = state
+        self.steps += 1
+        if self.steps % self.interval == 0:
+            self.keyframes.append((self.steps, len(self.events), idx, pack_row(self.state, 2)))
+
+    # Decode count events (all when None) from byte offset, starting after cell last.
+    # Return the list of (idx, state) and the offset of the next event.
+    def decode(self, offset=0, last=None, count=None):
+        if last is None:
+            last = self.entrance[1] * self.width + self.entrance[0]
+        return _decode(self.events, self.moves, offset, last, count)
+
+    # Size of the recorded run in bytes, without keyframes
+    def __len__(self):
+        return HEADER.size + len(pack_row(self.initial, 2)) + len(self.events)
+
+    # Write the trace to a file
+    def save(self, path):
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.solved, self.width, self.height,
+                                   self.entrance[0], self.entrance[1], self.steps, self.solve_time, len(self.events)))
+            file.write(pack_row(self.initial, 2))
+            file.write(self.events)
+
+    # Read a trace written by save() and rebuild its keyframes
+    @classmethod
+    def load(cls, path, interval=None):
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, solved, width, height, ex, ey, steps, solve_time, size = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("%s is not a trace file this version can read" % path)
+        start = HEADER.size
+        packed = (width * height * 2 + 7) // 8
+        trace = cls(width, height, unpack_row(data[start:start + packed], width * height, 2), (ex, ey), interval)
+        events = data[start + packed:start + packed + size]
+        if len(events) != size:
+            raise ValueError("%s is truncated" % path)
+        for idx, state in _decode(events, trace.moves, 0, trace.last, None)[0]:
+            trace.record(idx, state)
+        if trace.steps != steps:
+            raise ValueError("%s is corrupt" % path)
+        trace.solved = bool(solved)
+        trace.solve_time = solve_time
+        return trace
+
+# Solve a copy of the maze from entrance to exit at full speed and return its Trace
+def record_solve(maze, entrance, exit, interval=None):
+    cells, width, height = flatten(maze)
+    trace = Trace(width, height, cells, entrance, interval)
+    work = Grid(width, height, buffer=bytearray(cells))
+    cursor = [entrance[1] * width + entrance[0]]
+
+    # The solver has just marked the cell it stood on and is moving to next_pos
+    def step(maze, next_pos):
+        idx = cursor[0]
+        trace.record(idx, work.cells[idx])
+        if next_pos:
+            cursor[0] = next_pos[2] * width + next_pos[1]
+
+    started = time.perf_counter()
+    trace.solved = solve_maze(work, entrance, exit, step)
+    trace.solve_time = time.perf_counter() - started
+    if trace.solved:
+        # Reaching the exit marks it without a callback
+        trace.record(exit[1] * width + exit[0], CellType.WALKED)
+    return trace
+
+# Define a class for replaying a trace onto a grid
+class TracePlayer:
+
+    def __init__(self, trace, grid=None):
+        self.trace = trace
+        self.grid = grid if grid is not None else Grid(trace.width, trace.height)
+        self.seek(0)
+
+    # Jump to the state after the given number of steps
+    def seek(self, step):
+        trace = self.trace
+        step = max(0, min(step, trace.steps))
+        kept, offset, last, packed = trace.keyframes[step // trace.interval]
+        self.grid.cells[:] = unpack_row(packed, trace.width * trace.height, 2)
+        self.step, self.offset, self.last = kept, offset, last
+        self.advance(step - kept)
+        return self.grid
+
+    # Apply the next count steps (all of them when count is None) and return the changed (x, y) cells
+    def advance(self, count=None):
+        trace, cells, width = self.trace, self.grid.cells, self.trace.width
+        remaining = trace.steps - self.step
+        count = remaining if count is None else min(count, remaining)
+        if count <= 0:
+            return []
+        events, self.offset = trace.decode(self.offset, self.last, count)
+        changed = []
+        for idx, state in events:
+            cells[idx] = state
+            changed.append((idx % width, idx // width))
+        self.step += count
+        self.last = events[-1][0]
+        return changed
+
+    # Cell the solver stands on at the current step, or None once the trace is over
+    @property
+    def cursor(self):
+        if self.step >= self.trace.steps:
+            return None
+        idx = self.trace.decode(self.offset, self.last, 1)[0][0][0]
+        return idx % self.trace.width, idx // self.trace.width
+
+    @property
+    def finished(self):
+        return self.step >= self.trace.steps
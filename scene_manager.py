@@ -0,0 +1,94 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# scene_manager.py
+
+# runs every screen of the game (name prompt, main menu, maze game) as a scene inside one
+# process and one pygame display, instead of launching a new interpreter per window.
+
+# The SceneManager owns the display, the clock and a stack of scenes. Each frame it hands
+# the pygame events to the scene on top of the stack and then lets it update and draw.
+# push() opens a scene on top of the current one (the main menu opens the maze game),
+# pop() returns to the scene below, and replace() swaps the top scene (the name prompt
+# hands over to the main menu). Closing the window, or popping the last scene, ends the
+# loop.
+
+# A scene is any object with these members:
+#   size, caption              - the window size and title the scene wants
+#   enter(manager)             - called when the scene becomes the top scene
+#   leave()                    - called when it stops being the top scene
+#   handle_event(event)        - called for every pygame event
+#   update()                   - called once per frame to update and draw
+
+
+# Import the required libraries
+import pygame
+
+# Define a class for the scene manager
+class SceneManager:
+
+    # Initialize pygame and the shared display; debug prints timings such as the launch latency
+    def __init__(self, fps=60, debug=False):
+        pygame.init()
+        self.fps = fps
+        self.debug = debug
+        self.clock = pygame.time.Clock()
+        self.screen = None
+        self.size = None
+        self.scenes = []
+        self.running = False
+        # perf_counter() time of the click that launched the maze game, and the seconds from
+        # that click to the first maze frame once it has been drawn
+        self.launch_started = None
+        self.launch_latency = None
+
+    # Resize the shared display and set its caption for the given scene
+    def _show(self, scene):
+        if scene.size != self.size:
+            self.screen = pygame.display.set_mode(scene.size)
+            self.size = scene.size
+        pygame.display.set_caption(scene.caption)
+        scene.enter(self)
+
+    # Open a scene on top of the current one
+    def push(self, scene):
+        if self.scenes:
+            self.scenes[-1].leave()
+        self.scenes.append(scene)
+        self._show(scene)
+
+    # Close the top scene and return to the one below, or stop when none is left
+    def pop(self):
+        self.scenes.pop().leave()
+        if self.scenes:
+            self._show(self.scenes[-1])
+        else:
+            self.running = False
+
+    # Swap the top scene for another one
+    def replace(self, scene):
+        if self.scenes:
+            self.scenes.pop().leave()
+        self.push(scene)
+
+    # Stop the loop at the end of the current frame
+    def quit(self):
+        self.running = False
+
+    # Run the scene loop until the window is closed or the last scene is popped
+    def run(self, scene):
+        self.running = True
+        self.push(scene)
+        while self.running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.running = False
+                    break
+                self.scenes[-1].handle_event(event)
+                if not self.running or not self.scenes:
+                    break
+            if self.running and self.scenes:
+                self.scenes[-1].update()
+            self.clock.tick(self.fps)
+        while self.scenes:
+            self.scenes.pop().leave()
+        pygame.quit()
@@ -0,0 +1,97 @@
+# __________________________________PSEUDOCODE__________________________________
+
+# scores.py
+
+# stores the player name and the history of runs in a small SQLite database.
+
+# Each finished run is appended as one row of the runs table (date, time, level, retries,
+# solve time), so recording a run costs the same however long the history is. The
+# history is read back one page at a time, newest first, by walking the rowid index
+# (keyset paging), so showing a page does not depend on the size of the table either.
+
+# The database file is created on first use. On Windows it is hidden once, when created,
+# instead of running attrib on every write.
+
+
+# Import the required libraries
+import datetime
+import os
+import sqlite3
+import sys
+
+# State the database file name
+DATABASE_FILE = ".gamedata.db"
+
+FILE_ATTRIBUTE_HIDDEN = 0x02
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS player (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    username TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    retries INTEGER NOT NULL,
+    solve_time REAL
+);
+"""
+
+# Open the database, creating (and on Windows hiding) it on first use
+def connect(path=DATABASE_FILE):
+    created = not os.path.exists(path)
+    connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+    connection.executescript(SCHEMA)
+    if created and sys.platform == "win32":
+        import ctypes
+        ctypes.windll.kernel32.SetFileAttributesW(path, FILE_ATTRIBUTE_HIDDEN)
+    return connection
+
+# Remember the player name
+def set_username(username, path=DATABASE_FILE):
+    with connect(path) as connection:
+        connection.execute("INSERT OR REPLACE INTO player (id, username) VALUES (1, ?)", (username,))
+    connection.close()
+
+# Return the recorded player name, or None before one has been entered
+def get_username(path=DATABASE_FILE):
+    if not os.path.exists(path):
+        return None
+    connection = connect(path)
+    try:
+        row = connection.execute("SELECT username FROM player WHERE id = 1").fetchone()
+    finally:
+        connection.close()
+    return row["username"] if row else None
+
+# Append one run and return its id; date and time default to now
+def record_run(level, retries, solve_time=None, when=None, path=DATABASE_FILE):
+    when = when or datetime.datetime.now()
+    with connect(path) as connection:
+        cursor = connection.execute(
+            "INSERT INTO runs (date, time, level, retries, solve_time) VALUES (?, ?, ?, ?, ?)",
+            (when.strftime("%d/%m/%Y"), when.strftime("%H:%M:%S"), level, retries, solve_time))
+    connection.close()
+    return cursor.lastrowid
+
+# Return up to limit runs older than the run with id before (newest first when before is None)
+def page_runs(connection, before=None, limit=20):
+    if before is None:
+        query, args = "SELECT * FROM runs ORDER BY id DESC LIMIT ?", (limit,)
+    else:
+        query, args = "SELECT * FROM runs WHERE id < ? ORDER BY id DESC LIMIT ?", (before, limit)
+    return connection.execute(query, args).fetchall()
+
+# Return whether any run is older than the run with the given id
+def has_older(connection, before):
+    return connection.execute("SELECT 1 FROM runs WHERE id < ? LIMIT 1", (before,)).fetchone() is not None
+
+# Format one run the way the score window shows it
+def format_run(run):
+    text = "Date: %s\nTime: %s\nLevel: %s\nNO. of retries: %s\n" % (run["date"], run["time"], run["level"], run["retries"])
+    if run["solve_time"] is not None:
+        text += "Solve time: %.2fs\n" % run["solve_time"]
+    return text + "\n"